@@ -0,0 +1,151 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import date, datetime, time
+
+ARCHIVE_DIR = "archive"
+
+def parse_as_of(value):
+    """
+    Mengubah batas waktu snapshot (string ISO, date, atau datetime) menjadi
+    datetime lokal tanpa zona waktu, sebanding dengan `fetched_at` di index.
+    Tanggal saja ("2025-08-31") berarti akhir hari tersebut.
+    """
+    if isinstance(value, str):
+        value = value.strip()
+        parsed = datetime.fromisoformat(value)
+        # fromisoformat("YYYY-MM-DD") menghasilkan tengah malam; anggap akhir hari
+        if len(value) == 10:
+            parsed = datetime.combine(parsed.date(), time.max)
+        value = parsed
+    elif not isinstance(value, datetime) and isinstance(value, date):
+        value = datetime.combine(value, time.max)
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value
+
+class HtmlArchive:
+    """
+    Arsip respons HTML mentah (halaman daftar dan detail) yang dialamatkan
+    berdasarkan isinya (content-addressed).
+
+    Setiap respons disimpan sekali sebagai objects/<2 digit>/<sha256>.gz;
+    index.jsonl mencatat setiap pengambilan (url, sha256, waktu, ukuran, run),
+    sehingga beberapa snapshot dari URL yang sama tetap bisa dipilih.
+
+    `run` mengelompokkan semua halaman dari satu kali scraping. Re-ekstraksi
+    menjalankan parser sekali per run, sehingga halaman daftar dari setiap
+    hari scraping (dan halaman detail yang ditautkannya) tetap terjangkau.
+    """
+    def __init__(self, root=ARCHIVE_DIR):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.index_path = os.path.join(root, "index.jsonl")
+        self._index = None
+        self._lock = threading.Lock()
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.gz")
+
+    def _load_index(self):
+        index = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        index.setdefault(entry["url"], []).append(entry)
+        return index
+
+    def _ensure_index(self):
+        if self._index is None:
+            self._index = self._load_index()
+        return self._index
+
+    @staticmethod
+    def _run_of(entry):
+        # Entri dari sebelum ada run dikelompokkan per hari pengambilan
+        return entry.get("run") or entry["fetched_at"][:10]
+
+    def put(self, url, content, run=None):
+        """
+        Menyimpan respons mentah `content` (bytes) untuk `url`, sebagai bagian
+        dari scraping `run` (lihat new_run). Mengembalikan sha256 dari isi.
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._object_path(digest)
+        entry = {
+            "url": url,
+            "sha256": digest,
+            "fetched_at": datetime.now().isoformat(timespec="seconds"),
+            "size": len(content),
+        }
+        if run:
+            entry["run"] = run
+        with self._lock:
+            # Isi yang sama cukup disimpan sekali
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.tmp"
+                with gzip.open(tmp_path, "wb") as f:
+                    f.write(content)
+                os.replace(tmp_path, path)
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            if self._index is not None:
+                self._index.setdefault(url, []).append(entry)
+        return digest
+
+    @staticmethod
+    def new_run(portal=None):
+        """
+        Id run baru untuk satu kali scraping: "<portal>@<waktu mulai>".
+        """
+        return f"{portal or ''}@{datetime.now().isoformat(timespec='microseconds')}"
+
+    def runs(self, as_of=None, portal=None):
+        """
+        Semua run yang tercatat, dari yang paling lama. Jika `as_of` diberikan,
+        hanya run yang punya snapshot pada atau sebelum waktu tersebut; jika
+        `portal` diberikan, hanya run portal tersebut (ditambah run lama yang
+        belum mencatat portal).
+        """
+        if as_of:
+            as_of = parse_as_of(as_of)
+        with self._lock:
+            entries = [entry for url_entries in self._ensure_index().values() for entry in url_entries]
+        runs = {
+            self._run_of(entry) for entry in entries
+            if not as_of or datetime.fromisoformat(entry["fetched_at"]) <= as_of
+        }
+        if portal:
+            runs = {run for run in runs if "@" not in run or run.startswith(f"{portal}@")}
+        return sorted(runs, key=lambda run: run.rpartition("@")[2])
+
+    def snapshots(self, url):
+        """
+        Semua snapshot yang tercatat untuk `url`, dari yang paling lama.
+        """
+        with self._lock:
+            return list(self._ensure_index().get(url, []))
+
+    def get(self, url, as_of=None, run=None):
+        """
+        Mengembalikan isi mentah snapshot terbaru untuk `url` (bytes), atau None.
+        Jika `as_of` diberikan (lihat parse_as_of), hanya snapshot pada atau
+        sebelum waktu tersebut yang dipertimbangkan; jika `run` diberikan,
+        hanya snapshot dari run tersebut.
+        """
+        entries = self.snapshots(url)
+        if run:
+            entries = [entry for entry in entries if self._run_of(entry) == run]
+        if as_of:
+            as_of = parse_as_of(as_of)
+            entries = [entry for entry in entries if datetime.fromisoformat(entry["fetched_at"]) <= as_of]
+        if not entries:
+            return None
+        with gzip.open(self._object_path(entries[-1]["sha256"]), "rb") as f:
+            return f.read()
@@ -0,0 +1,112 @@
+import argparse
+from datetime import datetime
+from archive import ARCHIVE_DIR, HtmlArchive, parse_as_of
+from classifier import load_categories, load_category_tree
+from pipeline import PORTALS, run_pipeline
+from profiling import SamplingProfiler
+from store import STORE_PATH, ArticleStore
+
+def _parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+def _write_output(df, output):
+    if output.endswith(".csv"):
+        df.to_csv(output, index=False)
+    else:
+        df.to_excel(output, index=False)
+    print(f"💾 Hasil disimpan ke {output}")
+
+def _run_and_save(args, archive=None, offline=False, as_of=None, store=None):
+    """
+    Menjalankan pipeline sesuai argumen CLI (dengan profiler bila diminta)
+    lalu menyimpan hasilnya.
+    """
+    categories = None
+    category_tree = None
+    if not args.no_classify:
+        if args.hierarchical:
+            category_tree = load_category_tree()
+        else:
+            categories = load_categories()
+
+    def run():
+        return run_pipeline(args.portal, args.start, args.end, args.max_pages,
+                            categories=categories, category_tree=category_tree, parallel=args.parallel,
+                            archive=archive, offline=offline, as_of=as_of, store=store, compress_isi=args.compress_isi)
+
+    if args.profile:
+        with SamplingProfiler() as profiler:
+            hasil, df = run()
+        with open(args.profile, "w", encoding="utf-8") as f:
+            f.write(profiler.folded())
+        print(profiler.format_top())
+        print(f"🔬 Profil (folded stacks) disimpan ke {args.profile}")
+    else:
+        hasil, df = run()
+
+    if df is None:
+        print(f"⚠️ Tidak ada artikel ditemukan di {args.portal} dalam rentang waktu yang ditentukan.")
+        return
+    output = args.output or f"{args.portal.lower().replace(' ', '_')}_{args.start}_to_{args.end}.xlsx"
+    _write_output(df, output)
+
+def cmd_scrape(args):
+    archive = HtmlArchive(args.archive) if args.archive else None
+    store = ArticleStore(args.store) if args.store else None
+    _run_and_save(args, archive=archive, store=store)
+
+def cmd_reextract(args):
+    # Tidak ada akses jaringan: semua halaman dibaca dari arsip
+    store = ArticleStore(args.store) if args.store else None
+    _run_and_save(args, archive=HtmlArchive(args.archive), offline=True, as_of=args.as_of, store=store)
+
+def cmd_reclassify(args):
+    store = ArticleStore(args.store)
+    changes = store.sync_categories(load_categories())
+    print(f"✅ {len(changes)} dari {store.count()} artikel berubah kategori.")
+
+def _add_pipeline_arguments(subparser):
+    subparser.add_argument("--portal", required=True, choices=PORTALS)
+    subparser.add_argument("--start", required=True, type=_parse_date, help="Tanggal mulai (YYYY-MM-DD)")
+    subparser.add_argument("--end", required=True, type=_parse_date, help="Tanggal akhir (YYYY-MM-DD)")
+    subparser.add_argument("--max-pages", type=int, default=5)
+    subparser.add_argument("--no-classify", action="store_true", help="Lewati kategorisasi PDRB")
+    subparser.add_argument("--hierarchical", action="store_true", help="Klasifikasi hierarkis sektor -> sub-kategori")
+    subparser.add_argument("--parallel", action="store_true", help="Klasifikasi dengan beberapa proses worker")
+    subparser.add_argument("--compress-isi", action="store_true",
+                           help="Simpan isi artikel terkompresi di memori sampai dibutuhkan (untuk rentang tanggal yang panjang)")
+    subparser.add_argument("--output", help="File hasil (.xlsx atau .csv)")
+    subparser.add_argument("--profile", metavar="FILE", help="Jalankan dengan profiler sampling dan simpan folded stacks ke FILE")
+    subparser.add_argument("--store", metavar="DB", nargs="?", const=STORE_PATH,
+                           help=f"Simpan artikel dan klasifikasinya ke basis data DB (bawaan: {STORE_PATH})")
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Scraper & Kategorisasi Berita PDRB (mode batch)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    scrape = subparsers.add_parser("scrape", help="Scrape satu portal lalu klasifikasikan beritanya")
+    _add_pipeline_arguments(scrape)
+    scrape.add_argument("--archive", metavar="DIR", nargs="?", const=ARCHIVE_DIR,
+                        help=f"Arsipkan HTML mentah ke DIR (bawaan: {ARCHIVE_DIR})")
+    scrape.set_defaults(func=cmd_scrape)
+
+    reextract = subparsers.add_parser("reextract", help="Jalankan ulang parser atas HTML yang diarsipkan, tanpa jaringan")
+    _add_pipeline_arguments(reextract)
+    reextract.add_argument("--archive", metavar="DIR", default=ARCHIVE_DIR, help=f"Direktori arsip (bawaan: {ARCHIVE_DIR})")
+    reextract.add_argument("--as-of", metavar="WAKTU", type=parse_as_of,
+                           help="Pakai snapshot pada atau sebelum waktu ISO ini, mis. 2025-08-31T12:00 (tanggal saja berarti akhir hari)")
+    reextract.set_defaults(func=cmd_reextract)
+
+    reclassify = subparsers.add_parser("reclassify", help="Perbarui klasifikasi tersimpan setelah file kategori diubah")
+    reclassify.add_argument("--store", metavar="DB", default=STORE_PATH, help=f"Basis data artikel (bawaan: {STORE_PATH})")
+    reclassify.set_defaults(func=cmd_reclassify)
+
+    return parser
+
+if __name__ == "__main__":
+    parser = build_parser()
+    args = parser.parse_args()
+    # Basis data artikel hanya menyimpan klasifikasi datar
+    if args.command in ("scrape", "reextract") and args.store and (args.hierarchical or args.no_classify):
+        parser.error("--store tidak bisa digabung dengan --hierarchical atau --no-classify")
+    args.func(args)
@@ -1,13 +1,13 @@
 import streamlit as st
 import pandas as pd
+import io
+import os
 from datetime import datetime
-import re
-from collections import Counter
-from parsers import (
-    parse_presmedia, parse_sketsanews, parse_vnews,
-    parse_kepripedia, parse_hariankepri, parse_seputarkita,
-    parse_zonakepri, parse_ulasan, parse_batampos
-)
+from classifier import CATEGORY_FILES, load_categories, load_category_tree
+from pipeline import PORTALS
+from jobs import JobManager, FAILED
+from archive import HtmlArchive
+from store import STORE_PATH, ArticleStore
 
 # --- UI Configuration ---
 st.set_page_config(page_title="Scraper & Kategorisasi Berita", layout="wide")
@@ -16,36 +16,22 @@ st.markdown("Aplikasi untuk mengambil berita dan mengklasifikasikannya ke dalam
 
 # --- Helper Functions for New Categorization Logic ---
 
+def category_files_mtime():
+    """
+    Waktu modifikasi file kategori, dipakai sebagai kunci cache agar perubahan
+    CSV (misalnya sebelum `batch.py reclassify`) langsung terbaca dan basis
+    data artikel tidak menerima set keyword yang sudah usang.
+    """
+    return tuple(os.path.getmtime(file_name) if os.path.exists(file_name) else None for file_name in CATEGORY_FILES)
+
 @st.cache_data
-def load_and_process_categories():
+def load_and_process_categories(files_mtime):
     """
     Memuat kategori dan kata kunci dari file Produksi.csv dan Pengeluaran.csv.
     Menggabungkan keduanya menjadi satu dictionary.
     """
-    all_categories = {}
     try:
-        # Muat kedua file CSV
-        df_produksi = pd.read_csv("Produksi.csv")
-        df_pengeluaran = pd.read_csv("Pengeluaran.csv")
-        
-        # Gabungkan kedua DataFrame
-        df_combined = pd.concat([df_produksi, df_pengeluaran], ignore_index=True)
-
-        for _, row in df_combined.iterrows():
-            # Pastikan ada nilai di kolom Kategori dan Uraian
-            if pd.notna(row['Kategori']) and pd.notna(row['Uraian']):
-                kategori = str(row['Kategori']).strip()
-                # Uraian berisi keywords yang dipisahkan oleh newline
-                # Bersihkan setiap keyword: lowercase, hapus spasi, dan filter kata pendek
-                keywords = [
-                    re.sub(r'[^a-z0-9\s]', '', word.lower().strip())
-                    for word in str(row['Uraian']).split('\n')
-                    if len(word.strip()) > 2
-                ]
-                # Hindari duplikat keywords
-                all_categories[kategori] = list(set(keywords))
-        
-        return all_categories
+        return load_categories()
 
     except FileNotFoundError as e:
         st.error(f"❌ File tidak ditemukan: {e.filename}. Pastikan 'Produksi.csv' dan 'Pengeluaran.csv' ada di direktori yang sama.")
@@ -54,41 +40,92 @@ def load_and_process_categories():
         st.error(f"Terjadi kesalahan saat memuat file kategori: {e}")
         return None
 
-def classify_article_multi_label(text, categories):
+@st.cache_data
+def load_category_hierarchy(files_mtime):
+    """
+    Memuat kategori dari Produksi.csv dan Pengeluaran.csv sebagai hierarki
+    sektor -> sub-kategori untuk klasifikasi dua tahap.
+    """
+    try:
+        return load_category_tree()
+
+    except FileNotFoundError as e:
+        st.error(f"❌ File tidak ditemukan: {e.filename}. Pastikan 'Produksi.csv' dan 'Pengeluaran.csv' ada di direktori yang sama.")
+        return None
+    except Exception as e:
+        st.error(f"Terjadi kesalahan saat memuat hierarki kategori: {e}")
+        return None
+
+@st.cache_resource
+def get_job_manager():
+    """
+    Satu JobManager untuk seluruh proses server, sehingga job dan hasilnya
+    tidak hilang saat script di-rerun.
+    """
+    return JobManager()
+
+@st.cache_resource
+def get_html_archive():
+    return HtmlArchive()
+
+@st.cache_resource
+def get_article_store():
+    return ArticleStore()
+
+@st.cache_data
+def convert_df_to_excel(dataframe):
+    buffer = io.BytesIO()
+    dataframe.to_excel(buffer, index=False)
+    return buffer.getvalue()
+
+def show_job_result(job):
     """
-    Mengklasifikasikan teks artikel ke dalam maksimal 3 kategori teratas.
+    Menampilkan hasil job yang sudah selesai beserta tombol download.
     """
-    if not isinstance(text, str) or not categories:
-        return ["Bukan Kategori PDRB"]
-
-    text_lower = text.lower()
-    scores = Counter()
-
-    # Hitung skor untuk setiap kategori berdasarkan jumlah keyword yang cocok
-    for category, keywords in categories.items():
-        for keyword in keywords:
-            # Menggunakan word boundary (\b) agar tidak salah cocok (misal: 'emas' di dalam 'kemasan')
-            if re.search(r'\b' + re.escape(keyword) + r'\b', text_lower):
-                scores[category] += 1
-    
-    # Jika tidak ada keyword yang cocok sama sekali
-    if not scores:
-        return ["Bukan Kategori PDRB"]
-
-    # Urutkan kategori berdasarkan skor tertinggi dan ambil top 3
-    top_categories = [category for category, count in scores.most_common(3)]
-    
-    return top_categories
+    if job.status == FAILED:
+        st.error(f"❌ Job **{job.id}** gagal: {job.error}")
+        return
+    if job.df is None:
+        st.warning(f"⚠️ Tidak ada artikel ditemukan di **{job.portal}** dalam rentang waktu yang ditentukan.")
+    else:
+        st.success(f"✅ Berhasil memproses **{len(job.df)}** artikel.")
+        st.dataframe(job.df, use_container_width=True)
+
+        # --- Download Button ---
+        file_name = f"{job.portal.lower().replace(' ', '_')}_{job.start_date}_to_{job.end_date}.xlsx"
+        st.download_button(
+            label="📥 Download Hasil sebagai Excel",
+            data=convert_df_to_excel(job.df),
+            file_name=file_name,
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            key=f"download_{job.id}"
+        )
+
+    # --- Profiling Result ---
+    profiler = job.profiler
+    if profiler:
+        with st.expander(f"🔬 Hasil Profiling ({profiler.samples} sampel, {profiler.duration:.1f} detik)", expanded=True):
+            st.dataframe(pd.DataFrame(profiler.top_functions()), use_container_width=True)
+            st.download_button(
+                label="📥 Download Profil (folded stacks untuk flamegraph/speedscope)",
+                data=profiler.folded().encode('utf-8'),
+                file_name=f"profil_{job.portal.lower().replace(' ', '_')}_{job.start_date}_to_{job.end_date}.folded.txt",
+                mime="text/plain",
+                key=f"profile_{job.id}"
+            )
 
 # --- Load Categories ---
-all_pdrb_categories = load_and_process_categories()
+all_pdrb_categories = load_and_process_categories(category_files_mtime())
+job_manager = get_job_manager()
+if "job_ids" not in st.session_state:
+    st.session_state.job_ids = []
 
 # --- Sidebar Inputs ---
 st.sidebar.header("⚙️ Konfigurasi Scraper")
 
 portal = st.sidebar.selectbox(
     "📰 Pilih Portal Berita:",
-    ["Presmedia", "Sketsa News", "Vision News", "KepriPedia", "Harian Kepri", "Seputar Kita", "Zona Kepri", "Ulasan", "Batampos"]
+    PORTALS
 )
 
 st.sidebar.subheader("🗓️ Filter Tanggal")
@@ -105,60 +142,141 @@ do_classification = st.sidebar.toggle(
     'Aktifkan Kategorisasi Otomatis', value=True,
     help="Jika aktif, setiap berita akan diklasifikasikan ke dalam kategori PDRB."
 )
+hierarchical_classification = st.sidebar.toggle(
+    'Klasifikasi Hierarkis (Sektor → Sub-Kategori)', value=False,
+    help="Menilai sektor terlebih dahulu, lalu hanya sub-kategori di bawah sektor teratas. Menambahkan kolom Sektor 1-3."
+)
+parallel_classification = st.sidebar.toggle(
+    'Klasifikasi Paralel (Multi-Core)', value=False,
+    help="Membagi artikel ke beberapa proses worker. Berguna untuk korpus berita yang besar."
+)
+
+st.sidebar.subheader("🗄️ Arsip")
+archive_raw_html = st.sidebar.toggle(
+    'Arsipkan HTML Mentah', value=False,
+    help="Menyimpan respons halaman daftar dan detail (terkompresi) agar parser bisa dijalankan ulang tanpa scraping, lewat `python batch.py reextract`."
+)
+
+# Basis data artikel hanya menyimpan klasifikasi datar
+store_supported = do_classification and not hierarchical_classification
+store_articles = st.sidebar.toggle(
+    'Simpan ke Basis Data Artikel', value=False, disabled=not store_supported,
+    help="Menyimpan artikel dan hasil klasifikasi (datar) ke basis data lokal. Jika file kategori diubah, cukup jalankan `python batch.py reclassify` untuk memperbarui artikel yang terdampak saja."
+) and store_supported
+if not store_supported:
+    st.sidebar.caption("Basis data artikel hanya tersedia untuk kategorisasi datar (bukan hierarkis).")
+elif store_articles and parallel_classification:
+    st.sidebar.warning("Klasifikasi paralel diabaikan saat menyimpan ke basis data artikel.")
+
+compress_isi = st.sidebar.toggle(
+    'Kompres Isi Artikel di Memori', value=False,
+    help="Menyimpan isi artikel terkompresi selama proses berjalan dan baru membukanya saat klasifikasi dan pembuatan tabel. Menghemat memori untuk scraping banyak halaman."
+)
+
+st.sidebar.subheader("🔬 Diagnostik")
+do_profiling = st.sidebar.toggle(
+    'Mode Profiling', value=False,
+    help="Menjalankan seluruh proses di bawah profiler sampling dan menampilkan fungsi yang paling banyak memakan waktu. Hasil dapat diunduh sebagai folded stacks (flamegraph)."
+)
 
 # --- Action Button ---
 if st.sidebar.button("🚀 Mulai Proses"):
     if start_date > end_date:
         st.error("❌ Error: Tanggal mulai tidak boleh melebihi tanggal akhir.")
     else:
-        with st.spinner(f"Mengambil berita dari **{portal}**... Mohon tunggu ⏳"):
-            parser_map = {
-                "Presmedia": parse_presmedia, "Sketsa News": parse_sketsanews, "Vision News": parse_vnews,
-                "KepriPedia": parse_kepripedia, "Harian Kepri": parse_hariankepri, "Seputar Kita": parse_seputarkita,
-                "Zona Kepri": parse_zonakepri, "Ulasan": parse_ulasan, "Batampos": parse_batampos
-            }
-            parse_function = parser_map.get(portal)
-            hasil = parse_function(keyword=None, start_date=start_date, end_date=end_date, max_pages=max_pages) if parse_function else []
-
-            if not hasil:
-                st.warning(f"⚠️ Tidak ada artikel ditemukan di **{portal}** dalam rentang waktu yang ditentukan.")
-            else:
-                df = pd.DataFrame(hasil)
-                
-                # --- New Multi-Label Categorization Logic ---
-                if do_classification and all_pdrb_categories:
-                    st.info("Melakukan klasifikasi multi-label...")
-                    
-                    # Terapkan fungsi klasifikasi
-                    kategori_list = df['isi'].apply(lambda x: classify_article_multi_label(x, all_pdrb_categories))
-                    
-                    # Buat kolom baru dari hasil klasifikasi (maksimal 3)
-                    kategori_df = pd.DataFrame(kategori_list.tolist(), index=kategori_list.index).fillna('')
-                    for i in range(3):
-                        col_name = f'Kategori {i+1}'
-                        df[col_name] = kategori_df[i] if i in kategori_df.columns else ''
-
-                    # Susun ulang urutan kolom
-                    df = df[['Kategori 1', 'Kategori 2', 'Kategori 3', 'tanggal', 'judul', 'isi', 'link']]
-                else:
-                    df = df[['tanggal', 'judul', 'isi', 'link']]
-
-                st.success(f"✅ Berhasil memproses **{len(df)}** artikel.")
-                st.dataframe(df, use_container_width=True)
-
-                # --- Download Button ---
-                @st.cache_data
-                def convert_df_to_excel(dataframe):
-                    return dataframe.to_excel(index=False).encode('utf-8')
-
-                excel_data = convert_df_to_excel(df)
-                file_name = f"{portal.lower().replace(' ', '_')}_{start_date}_to_{end_date}.xlsx"
-                st.download_button(
-                    label="📥 Download Hasil sebagai Excel",
-                    data=excel_data,
-                    file_name=file_name,
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
+        category_tree = None
+        categories = None
+        if do_classification and hierarchical_classification:
+            category_tree = load_category_hierarchy(category_files_mtime())
+        elif do_classification:
+            categories = all_pdrb_categories
+
+        # Job berjalan di thread pool JobManager, di luar eksekusi script ini
+        job_id = job_manager.submit(
+            portal, start_date, end_date, max_pages,
+            categories=categories, category_tree=category_tree,
+            parallel=parallel_classification, profile=do_profiling,
+            archive=get_html_archive() if archive_raw_html else None,
+            store=get_article_store() if store_articles else None,
+            compress_isi=compress_isi
+        )
+        st.session_state.job_ids.append(job_id)
+        st.success(f"📨 Job **{job_id}** untuk **{portal}** masuk antrean. Anda bisa mengirim job lain sambil menunggu.")
+
+# --- Job List ---
+# Fragment ini diperbarui sendiri setiap JOB_POLL_SECONDS selama masih ada job
+# yang berjalan, dan berhenti polling begitu semua job selesai
+JOB_POLL_SECONDS = 2
+jobs_running = any(not job.finished for job in job_manager.list(st.session_state.job_ids))
+
+@st.fragment(run_every=JOB_POLL_SECONDS if jobs_running else None)
+def show_job_list():
+    jobs = job_manager.list(st.session_state.job_ids)
+    # Job yang sudah dibuang JobManager (kedaluwarsa) juga dilepas dari sesi ini
+    st.session_state.job_ids = [job.id for job in jobs]
+    if not jobs:
+        return
+
+    st.subheader("📋 Daftar Job")
+    st.dataframe(pd.DataFrame([job.summary() for job in jobs]), use_container_width=True)
+
+    finished_jobs = {job.id: job for job in reversed(jobs) if job.finished}
+    if finished_jobs:
+        # Job terbaru ditampilkan paling atas
+        selected_id = st.selectbox(
+            "Lihat hasil job:", list(finished_jobs),
+            format_func=lambda job_id: f"{job_id} — {finished_jobs[job_id].portal} ({finished_jobs[job_id].status})"
+        )
+        show_job_result(finished_jobs[selected_id])
+
+        if st.button("🗑️ Hapus Job Ini"):
+            job_manager.remove(selected_id)
+            st.session_state.job_ids.remove(selected_id)
+            st.rerun()
+
+    if jobs_running and all(job.finished for job in jobs):
+        # Rerun seluruh halaman agar fragment dibuat ulang tanpa run_every
+        st.rerun()
+
+show_job_list()
+
+# --- Trend View ---
+# Dibangun hanya dari tabel rollup di basis data artikel, tanpa membaca isi berita.
+# Basis data baru dibuka jika filenya sudah ada, agar halaman ini tidak membuatnya.
+with st.expander("📈 Tren Berita per Kategori PDRB (dari Basis Data Artikel)"):
+    st.caption("Hanya berisi berita dari proses dengan kategorisasi datar dan **'Simpan ke Basis Data Artikel'** aktif; "
+               "hasil klasifikasi hierarkis tidak masuk ke rollup.")
+    article_store = get_article_store() if os.path.exists(STORE_PATH) else None
+    date_range = article_store.rollup_date_range() if article_store else None
+    if not date_range or not date_range[0]:
+        st.info("Belum ada artikel tersimpan. Aktifkan **'Simpan ke Basis Data Artikel'** lalu jalankan proses scraping.")
+    else:
+        min_date = datetime.strptime(date_range[0], "%Y-%m-%d").date()
+        max_date = datetime.strptime(date_range[1], "%Y-%m-%d").date()
+        col_start, col_end, col_period = st.columns(3)
+        trend_start = col_start.date_input("Dari", value=min_date, min_value=min_date, max_value=max_date, key="trend_start")
+        trend_end = col_end.date_input("Sampai", value=max_date, min_value=min_date, max_value=max_date, key="trend_end")
+        period_label = col_period.radio("Periode", ["Harian", "Mingguan", "Bulanan"], horizontal=True, key="trend_period")
+        period = {"Harian": "D", "Mingguan": "W", "Bulanan": "M"}[period_label]
+
+        trend_portals = st.multiselect("Portal", article_store.rollup_portals(), key="trend_portals",
+                                       help="Kosongkan untuk semua portal.")
+        default_categories = [category for category, _ in article_store.top_categories(5, trend_start, trend_end, trend_portals)]
+        trend_categories = st.multiselect("Kategori", article_store.rollup_categories(), default=default_categories,
+                                          key="trend_categories")
+
+        rows = article_store.category_trend(trend_start, trend_end, trend_portals, trend_categories, period)
+        if not rows:
+            st.warning("Tidak ada data untuk filter yang dipilih.")
+        else:
+            trend_df = pd.DataFrame(rows, columns=["periode", "kategori", "jumlah"])
+            trend_pivot = trend_df.pivot(index="periode", columns="kategori", values="jumlah").fillna(0)
+            st.line_chart(trend_pivot)
+
+            portal_df = pd.DataFrame(article_store.portal_trend(trend_start, trend_end, trend_portals, period),
+                                     columns=["periode", "portal", "jumlah"])
+            st.caption("Jumlah artikel per portal")
+            st.bar_chart(portal_df.pivot(index="periode", columns="portal", values="jumlah").fillna(0))
 
 # --- Instructions ---
 st.sidebar.markdown("---")
@@ -166,5 +284,5 @@ st.sidebar.info(
     "**Cara Penggunaan:**\n"
     "1. Pilih portal berita & atur filter.\n"
     "2. Pastikan toggle **'Aktifkan Kategorisasi'** menyala jika ingin mengklasifikasikan berita.\n"
-    "3. Klik tombol **'Mulai Proses'**."
+    "3. Klik tombol **'Mulai Proses'**. Proses berjalan di latar belakang; progres dan hasilnya diperbarui otomatis di **Daftar Job**."
 )
\ No newline at end of file
@@ -0,0 +1,290 @@
+import re
+import os
+import csv
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+NON_PDRB_LABEL = "Bukan Kategori PDRB"
+
+# File kategori PDRB (pendekatan produksi dan pengeluaran)
+CATEGORY_FILES = ["Produksi.csv", "Pengeluaran.csv"]
+
+# Baris kategori di Produksi.csv yang sektornya tidak ditandai baris sektor
+# (tanpa Uraian) di atasnya. Nilainya adalah nama sektor PDRB-nya; baris yang
+# sektornya berbeda dari baris sebelumnya membuka sektor baru.
+SECTOR_STARTS = {
+    "Pengadaan Air, Pengelolaan Sampah, Limbah dan Daur Ulang": "Pengadaan Air, Pengelolaan Sampah, Limbah dan Daur Ulang",
+    "Konstruksi": "Konstruksi",
+    "Angkutan Rel": "Transportasi dan Pergudangan",
+    "Angkutan Darat": "Transportasi dan Pergudangan",
+    "Angkutan Laut": "Transportasi dan Pergudangan",
+    "Angkutan Sungai Danau dan Penyeberangan": "Transportasi dan Pergudangan",
+    "Angkutan Udara": "Transportasi dan Pergudangan",
+    "Pergudangan dan Jasa Penunjang Angkutan, Pos dan Kurir": "Transportasi dan Pergudangan",
+    "Informasi dan Komunikasi": "Informasi dan Komunikasi",
+    "Real Estate": "Real Estate",
+    "Jasa Perusahaan": "Jasa Perusahaan",
+    "Administrasi Pemerintahan, Pertahanan dan Jaminan Sosial Wajib": "Administrasi Pemerintahan, Pertahanan dan Jaminan Sosial Wajib",
+    "Jasa Pendidikan": "Jasa Pendidikan",
+    "Jasa Kesehatan dan Kegiatan Sosial": "Jasa Kesehatan dan Kegiatan Sosial",
+    "Jasa lainnya": "Jasa lainnya",
+}
+
+# Penomoran baris di Pengeluaran.csv: "1. ..." adalah sektor, "1.a. ..." sub-kategori
+_NUMBERED_SECTOR = re.compile(r'^\(?\d+\.\s')
+_LETTERED_ROW = re.compile(r'^(\d+\.)?[a-z]\.\s')
+
+# Indeks keyword milik proses worker, dibangun sekali oleh _init_worker
+_worker_index = None
+_worker_hierarchical = False
+
+def parse_keywords(uraian):
+    """
+    Memecah kolom Uraian menjadi daftar keyword unik.
+    Keyword dipisahkan oleh newline; setiap keyword di-lowercase, dibersihkan
+    dari tanda baca, dan kata yang terlalu pendek dibuang.
+    """
+    keywords = [
+        re.sub(r'[^a-z0-9\s]', '', word.lower().strip())
+        for word in str(uraian).split('\n')
+        if len(word.strip()) > 2
+    ]
+    # Hindari duplikat keywords
+    return list(set(keywords))
+
+def build_category_tree(rows):
+    """
+    Menyusun hierarki sektor -> sub-kategori dari baris (Kategori, Uraian)
+    sesuai urutan di file CSV.
+
+    Baris tanpa Uraian adalah baris sektor; baris tanpa Uraian yang langsung
+    mengikuti baris sektor (atau berhuruf a., b., ...) hanya sub-kelompok dan
+    tidak membuka sektor baru. Baris bernomor ("1.", "2.") selalu membuka
+    sektor baru, dan baris pada SECTOR_STARTS masuk ke sektor yang tercatat di sana.
+
+    Baris ber-Uraian lain yang jatuh ke sektor yang tidak dibuka oleh baris
+    sektor (misalnya karena namanya diubah sehingga tidak lagi cocok dengan
+    SECTOR_STARTS) dicetak sebagai peringatan, karena sektornya hanya tebakan.
+    Menghasilkan dictionary {sektor: {sub-kategori: [keywords]}}.
+    """
+    tree = {}
+    sector = None
+    sector_from_heading = False
+    previous_was_header = False
+
+    for kategori, uraian in rows:
+        if not isinstance(kategori, str) or not kategori.strip():
+            continue
+        kategori = kategori.strip()
+        has_keywords = isinstance(uraian, str) and uraian.strip() != ''
+
+        if kategori in SECTOR_STARTS:
+            sector = SECTOR_STARTS[kategori]
+            sector_from_heading = False
+        elif _NUMBERED_SECTOR.match(kategori):
+            sector = kategori
+            sector_from_heading = True
+        elif _LETTERED_ROW.match(kategori):
+            pass
+        elif not has_keywords and not previous_was_header:
+            sector = kategori
+            sector_from_heading = True
+        elif has_keywords and not sector_from_heading:
+            print(f"⚠️ [KATEGORI] '{kategori}' tidak memiliki baris sektor di atasnya dan tidak ada di SECTOR_STARTS; "
+                  f"dimasukkan ke sektor '{sector or kategori}'.")
+            if sector is None:
+                sector = kategori
+
+        previous_was_header = not has_keywords
+        if has_keywords:
+            tree.setdefault(sector, {})[kategori] = parse_keywords(uraian)
+
+    return tree
+
+def keyword_pattern(keyword):
+    """
+    Pola regex untuk satu keyword. Word boundary dipakai agar tidak salah
+    cocok (misal: 'emas' di dalam 'kemasan').
+    """
+    return re.compile(r'\b' + re.escape(keyword) + r'\b')
+
+def build_keyword_index(categories):
+    """
+    Mengompilasi pola regex untuk setiap keyword satu kali saja.
+    Menghasilkan list (kategori, [pola]) dengan urutan yang sama seperti dictionary kategori.
+    """
+    return [
+        (category, [keyword_pattern(keyword) for keyword in keywords])
+        for category, keywords in categories.items()
+    ]
+
+def rank_categories(scores, category_order):
+    """
+    Mengambil maksimal 3 kategori dengan skor tertinggi dari dictionary
+    {kategori: skor}. Skor yang sama diurutkan sesuai `category_order`
+    (urutan baris di file kategori).
+    """
+    ranked = Counter()
+    for category in category_order:
+        if scores.get(category):
+            ranked[category] = scores[category]
+    if not ranked:
+        return [NON_PDRB_LABEL]
+    return [category for category, count in ranked.most_common(3)]
+
+def classify_with_index(text, index):
+    """
+    Mengklasifikasikan teks artikel ke dalam maksimal 3 kategori teratas,
+    memakai indeks keyword yang sudah dikompilasi oleh build_keyword_index.
+    Skor adalah jumlah keyword berbeda yang cocok; urutan skor yang sama
+    mengikuti rank_categories.
+    """
+    if not isinstance(text, str) or not index:
+        return [NON_PDRB_LABEL]
+
+    text_lower = text.lower()
+    scores = {}
+
+    for category, patterns in index:
+        score = sum(1 for pattern in patterns if pattern.search(text_lower))
+        if score:
+            scores[category] = score
+
+    return rank_categories(scores, [category for category, _ in index])
+
+def read_category_rows(files=CATEGORY_FILES):
+    """
+    Membaca baris (Kategori, Uraian) dari file-file kategori sesuai urutannya.
+    Sel kosong dikembalikan sebagai None.
+    """
+    rows = []
+    for file_name in files:
+        with open(file_name, encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                rows.append((row.get('Kategori') or None, row.get('Uraian') or None))
+    return rows
+
+def load_categories(files=CATEGORY_FILES):
+    """
+    Memuat kategori dan kata kunci dari file-file kategori menjadi satu
+    dictionary {kategori: [keywords]}. Baris tanpa Uraian dilewati.
+    """
+    all_categories = {}
+    for kategori, uraian in read_category_rows(files):
+        if kategori is not None and uraian is not None:
+            all_categories[kategori.strip()] = parse_keywords(uraian)
+    return all_categories
+
+def load_category_tree(files=CATEGORY_FILES):
+    """
+    Memuat file-file kategori sebagai hierarki sektor -> sub-kategori.
+    """
+    return build_category_tree(read_category_rows(files))
+
+# --- Hierarchical Classification ---
+
+def build_hierarchical_index(tree):
+    """
+    Mengompilasi indeks dua tahap dari hasil build_category_tree.
+    Setiap sektor mendapat satu pola gabungan berisi semua keyword di bawahnya
+    (tahap 1), dan setiap sub-kategori tetap memiliki pola per keyword (tahap 2).
+    """
+    index = []
+    for sector, leaves in tree.items():
+        # Keyword terpanjang didahulukan agar frasa tidak terpotong oleh keyword yang lebih pendek
+        sector_keywords = sorted({k for keywords in leaves.values() for k in keywords if k}, key=len, reverse=True)
+        if not sector_keywords:
+            continue
+        sector_pattern = re.compile(r'\b(?:' + '|'.join(re.escape(k) for k in sector_keywords) + r')\b')
+        index.append((sector, sector_pattern, build_keyword_index(leaves)))
+    return index
+
+def classify_hierarchical(text, index, top_sectors=2):
+    """
+    Klasifikasi dua tahap: sektor dinilai terlebih dahulu dengan satu pola
+    gabungan per sektor, lalu hanya sub-kategori di bawah `top_sectors`
+    sektor teratas yang dinilai per keyword.
+    Mengembalikan maksimal 3 pasangan (sektor, sub-kategori).
+    """
+    if not isinstance(text, str) or not index:
+        return [("", NON_PDRB_LABEL)]
+
+    text_lower = text.lower()
+    sector_scores = Counter()
+    leaf_indexes = {}
+
+    # Tahap 1: jumlah keyword berbeda yang muncul untuk setiap sektor
+    for sector, sector_pattern, leaf_index in index:
+        found = set(sector_pattern.findall(text_lower))
+        if found:
+            sector_scores[sector] = len(found)
+            leaf_indexes[sector] = leaf_index
+
+    if not sector_scores:
+        return [("", NON_PDRB_LABEL)]
+
+    # Tahap 2: skor sub-kategori hanya untuk sektor teratas
+    scores = Counter()
+    for sector, _ in sector_scores.most_common(top_sectors):
+        for leaf, patterns in leaf_indexes[sector]:
+            for pattern in patterns:
+                if pattern.search(text_lower):
+                    scores[(sector, leaf)] += 1
+
+    if not scores:
+        return [("", NON_PDRB_LABEL)]
+
+    return [pair for pair, count in scores.most_common(3)]
+
+# --- Parallel Classification ---
+
+def _build_index(categories, hierarchical):
+    return build_hierarchical_index(categories) if hierarchical else build_keyword_index(categories)
+
+def _classify_one(text, index, hierarchical):
+    return classify_hierarchical(text, index) if hierarchical else classify_with_index(text, index)
+
+def _init_worker(categories, hierarchical):
+    global _worker_index, _worker_hierarchical
+    _worker_index = _build_index(categories, hierarchical)
+    _worker_hierarchical = hierarchical
+
+def _classify_shard(texts):
+    return [_classify_one(text, _worker_index, _worker_hierarchical) for text in texts]
+
+def classify_articles(texts, categories, parallel=False, workers=None, hierarchical=False):
+    """
+    Mengklasifikasikan sekumpulan teks artikel dan mengembalikan list hasil
+    (maksimal 3 kategori per artikel) dengan urutan yang sama seperti input.
+
+    Jika `hierarchical` aktif, `categories` adalah hasil build_category_tree
+    dan setiap hasil berupa pasangan (sektor, sub-kategori).
+
+    Jika `parallel` aktif, korpus dibagi menjadi beberapa shard yang diproses
+    oleh proses worker terpisah. Setiap worker mengompilasi indeks keyword
+    satu kali saat dijalankan, bukan per artikel.
+    """
+    texts = list(texts)
+    if not categories:
+        empty = ("", NON_PDRB_LABEL) if hierarchical else NON_PDRB_LABEL
+        return [[empty] for _ in texts]
+
+    workers = workers or os.cpu_count() or 1
+    if not parallel or workers < 2 or len(texts) < 2:
+        index = _build_index(categories, hierarchical)
+        return [_classify_one(text, index, hierarchical) for text in texts]
+
+    # Beberapa shard per worker agar beban tetap seimbang bila panjang artikel bervariasi
+    shard_size = max(1, -(-len(texts) // (workers * 4)))
+    shards = [texts[i:i + shard_size] for i in range(0, len(texts), shard_size)]
+
+    # 'spawn' dipakai karena proses utama (Streamlit) berjalan multi-thread
+    context = multiprocessing.get_context("spawn")
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(categories, hierarchical)) as executor:
+        # executor.map menjaga urutan shard sehingga hasil tetap sejajar dengan input
+        for shard_result in executor.map(_classify_shard, shards):
+            results.extend(shard_result)
+    return results
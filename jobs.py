@@ -0,0 +1,151 @@
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pipeline import run_pipeline
+from profiling import SamplingProfiler
+
+# Status job
+QUEUED = "antri"
+RUNNING = "berjalan"
+DONE = "selesai"
+FAILED = "gagal"
+
+# Job yang sudah selesai dibuang dari memori setelah umur ini, dan hanya
+# sejumlah ini job selesai terbaru yang disimpan
+FINISHED_JOB_TTL = timedelta(hours=2)
+MAX_FINISHED_JOBS = 20
+
+class Job:
+    """
+    Satu permintaan scraping yang dijalankan di latar belakang.
+    Atribut progres diperbarui oleh thread worker dan hanya dibaca oleh UI.
+    Hanya DataFrame hasil yang disimpan; daftar artikel mentah dilepas
+    begitu pipeline selesai.
+    """
+    def __init__(self, portal, start_date, end_date, max_pages):
+        self.id = uuid.uuid4().hex[:8]
+        self.portal = portal
+        self.start_date = start_date
+        self.end_date = end_date
+        self.max_pages = max_pages
+        self.status = QUEUED
+        self.pages_done = 0
+        self.articles = 0
+        self.submitted_at = datetime.now()
+        self.finished_at = None
+        self.df = None
+        self.error = None
+        self.profiler = None
+
+    @property
+    def progress(self):
+        if self.status == DONE:
+            return 1.0
+        return self.pages_done / self.max_pages if self.max_pages else 0.0
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+    def summary(self):
+        return {
+            "id": self.id,
+            "portal": self.portal,
+            "rentang": f"{self.start_date} s/d {self.end_date}",
+            "status": self.status,
+            "progres": f"{self.progress:.0%}",
+            "artikel": self.articles,
+            "dikirim": self.submitted_at.strftime("%H:%M:%S"),
+            "selesai": self.finished_at.strftime("%H:%M:%S") if self.finished_at else "",
+        }
+
+class JobManager:
+    """
+    Menjalankan job scraping di thread pool yang terpisah dari eksekusi script
+    Streamlit, sehingga job tetap berjalan dan hasilnya tetap tersimpan
+    walaupun halaman di-rerun.
+
+    Job yang sudah selesai lebih lama dari `finished_ttl`, atau di luar
+    `max_finished` job selesai terbaru, dihapus dari memori.
+    """
+    def __init__(self, max_workers=2, finished_ttl=FINISHED_JOB_TTL, max_finished=MAX_FINISHED_JOBS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scrape-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._finished_ttl = finished_ttl
+        self._max_finished = max_finished
+
+    def submit(self, portal, start_date, end_date, max_pages, categories=None, category_tree=None, parallel=False, profile=False,
+               archive=None, store=None, compress_isi=False):
+        job = Job(portal, start_date, end_date, max_pages)
+        with self._lock:
+            self._evict()
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, categories, category_tree, parallel, profile, archive, store, compress_isi)
+        return job.id
+
+    def _run(self, job, categories, category_tree, parallel, profile, archive, store, compress_isi):
+        job.status = RUNNING
+
+        def progress(pages_done, max_pages, articles):
+            job.pages_done = pages_done
+            job.articles = articles
+
+        try:
+            # Profiler dimulai di thread worker sehingga yang disampel adalah job ini
+            if profile:
+                job.profiler = SamplingProfiler()
+                with job.profiler:
+                    hasil, job.df = run_pipeline(job.portal, job.start_date, job.end_date, job.max_pages,
+                                                 categories, category_tree, parallel, progress=progress, archive=archive, store=store,
+                                                 compress_isi=compress_isi)
+            else:
+                hasil, job.df = run_pipeline(job.portal, job.start_date, job.end_date, job.max_pages,
+                                             categories, category_tree, parallel, progress=progress, archive=archive, store=store,
+                                             compress_isi=compress_isi)
+            job.articles = len(hasil)
+            job.status = DONE
+        except Exception as e:
+            print(f"[JOB ERROR] {job.id}: {e}")
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = datetime.now()
+
+    def _evict(self):
+        """
+        Membuang job selesai yang kedaluwarsa atau melebihi batas jumlah.
+        Dipanggil dengan self._lock sudah dipegang.
+        """
+        now = datetime.now()
+        finished = sorted((job for job in self._jobs.values() if job.finished), key=lambda job: job.finished_at)
+        for i, job in enumerate(finished):
+            if now - job.finished_at > self._finished_ttl or i < len(finished) - self._max_finished:
+                del self._jobs[job.id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self, job_ids=None):
+        """
+        Mengembalikan job sesuai urutan `job_ids` (atau semua job jika None).
+        Id job yang sudah dihapus dilewati.
+        """
+        with self._lock:
+            self._evict()
+            if job_ids is None:
+                return list(self._jobs.values())
+            return [self._jobs[job_id] for job_id in job_ids if job_id in self._jobs]
+
+    def remove(self, job_id):
+        """
+        Menghapus job yang sudah selesai beserta hasilnya dari memori.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job and job.finished:
+                del self._jobs[job_id]
+                return True
+            return False
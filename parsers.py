@@ -1,21 +1,143 @@
 import requests
 from bs4 import BeautifulSoup
 from datetime import datetime
+from html.parser import HTMLParser
+from contextlib import contextmanager
+import codecs
+import threading
 import time
+from records import ArticleCollection
+
+# Halaman detail diunduh secara streaming dan koneksi ditutup begitu elemen
+# yang dibutuhkan (tanggal, judul, isi) sudah lengkap diterima.
+STREAM_DETAIL_PAGES = True
+STREAM_CHUNK_SIZE = 16 * 1024
+
+# Pengaturan arsip per thread, diatur lewat archive_context()
+_fetch_state = threading.local()
+
+# --- Helper Class ---
+class _ArticleEndDetector(HTMLParser):
+    """
+    Incremental HTML parser that watches for a set of target elements and
+    reports when every one of them has been opened and closed.
+
+    Targets are (tag, classes) tuples; an element matches when its tag name
+    equals `tag` and its class attribute contains every class in `classes`.
+    Only the first matching element of each target is tracked, mirroring
+    BeautifulSoup's find()/select_one().
+    """
+    def __init__(self, targets):
+        super().__init__(convert_charrefs=False)
+        self.targets = [(tag, set(classes.split())) for tag, classes in targets]
+        self.depths = [0] * len(self.targets)
+        self.done = [False] * len(self.targets)
+
+    @property
+    def complete(self):
+        return all(self.done)
+
+    def handle_starttag(self, tag, attrs):
+        classes = None
+        for i, (target_tag, target_classes) in enumerate(self.targets):
+            if self.done[i] or tag != target_tag:
+                continue
+            if self.depths[i]:
+                self.depths[i] += 1
+                continue
+            if classes is None:
+                classes = set((dict(attrs).get('class') or '').split())
+            if target_classes <= classes:
+                self.depths[i] = 1
+
+    def handle_endtag(self, tag):
+        for i, (target_tag, _) in enumerate(self.targets):
+            if self.depths[i] and tag == target_tag:
+                self.depths[i] -= 1
+                if not self.depths[i]:
+                    self.done[i] = True
 
 # --- Helper Function ---
-def get_content(url, retries=3):
+@contextmanager
+def archive_context(archive, offline=False, as_of=None, run=None, portal=None):
+    """
+    Within this block, every page fetched by the current thread is saved to
+    `archive` (an archive.HtmlArchive) under one scraping run. With
+    `offline=True` nothing is downloaded: pages are read back from the archive
+    instead (from `run` and at or before `as_of` if given), so the parse_*
+    functions can be re-run over archived HTML without network access.
+    """
+    if not offline and run is None:
+        run = archive.new_run(portal)
+    previous = tuple(getattr(_fetch_state, name, None) for name in ('archive', 'offline', 'as_of', 'run'))
+    _fetch_state.archive, _fetch_state.offline, _fetch_state.as_of, _fetch_state.run = archive, offline, as_of, run
+    try:
+        yield
+    finally:
+        _fetch_state.archive, _fetch_state.offline, _fetch_state.as_of, _fetch_state.run = previous
+
+def _polite_delay(seconds=0.5):
+    # Jeda antar artikel hanya perlu saat mengambil dari jaringan
+    if not getattr(_fetch_state, 'offline', False):
+        time.sleep(seconds)
+
+def _fetch_until(url, headers, stop_after):
+    """
+    Streams a page and stops reading as soon as all `stop_after` elements are
+    complete. Returns the raw bytes received so far.
+    """
+    detector = _ArticleEndDetector(stop_after)
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    chunks = []
+    with requests.get(url, headers=headers, timeout=15, stream=True) as r:
+        r.raise_for_status()
+        # requests meminta transfer terkompresi secara bawaan; iter_content mendekompresinya otomatis
+        for chunk in r.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+            chunks.append(chunk)
+            detector.feed(decoder.decode(chunk))
+            if detector.complete:
+                break
+    return b''.join(chunks)
+
+def get_content(url, retries=3, stop_after=None):
     """
     Fetches and parses content from a URL with retries and a user-agent header.
+
+    If `stop_after` is given (a list of (tag, classes) tuples) and
+    STREAM_DETAIL_PAGES is enabled, the page is streamed and the connection is
+    closed once those elements have been fully received; the rest of the page
+    (footer, sidebar, scripts) is never downloaded.
+
+    Inside archive_context() responses are archived, or read back from the
+    archive when offline. Archived pages are always fetched in full, so that a
+    later reextract is not limited to what the current parser needed; a failed
+    archive write is reported but does not fail the fetch.
     """
+    archive = getattr(_fetch_state, 'archive', None)
+    if archive is not None and getattr(_fetch_state, 'offline', False):
+        content = archive.get(url, as_of=_fetch_state.as_of, run=_fetch_state.run)
+        if content is None:
+            print(f"[ARSIP] Tidak ada salinan untuk URL {url}")
+            return None
+        return BeautifulSoup(content, 'html.parser')
+
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
     }
     for attempt in range(retries):
         try:
-            r = requests.get(url, headers=headers, timeout=15)
-            r.raise_for_status()
-            return BeautifulSoup(r.content, 'html.parser')
+            if stop_after and STREAM_DETAIL_PAGES and archive is None:
+                content = _fetch_until(url, headers, stop_after)
+            else:
+                r = requests.get(url, headers=headers, timeout=15)
+                r.raise_for_status()
+                content = r.content
+            if archive is not None:
+                try:
+                    archive.put(url, content, run=_fetch_state.run)
+                except OSError as e:
+                    print(f"[ARSIP] Gagal menyimpan salinan URL {url}: {e}")
+            return BeautifulSoup(content, 'html.parser')
         except requests.exceptions.RequestException as e:
             print(f"[ERROR] Gagal mengambil URL {url}: {e}")
             if attempt < retries - 1:
@@ -26,12 +148,14 @@ def get_content(url, retries=3):
                 return None
 
 # --- Parser for Presmedia ---
-def parse_presmedia(keyword=None, start_date=None, end_date=None, max_pages=10):
+def parse_presmedia(keyword=None, start_date=None, end_date=None, max_pages=10, progress=None, compress_isi=False):
     # Note: This parser uses category pages, so the 'keyword' argument is ignored.
-    results = []
+    results = ArticleCollection(portal="Presmedia", compress_isi=compress_isi)
     base_url = "https://presmedia.id/kanal/tanjungpinang/page/"
 
     for page in range(1, max_pages + 1):
+        if progress:
+            progress(page - 1, max_pages, len(results))
         url = f"{base_url}{page}"
         print(f"🔎 Mengambil halaman Presmedia: {url}")
         soup = get_content(url)
@@ -51,7 +175,7 @@ def parse_presmedia(keyword=None, start_date=None, end_date=None, max_pages=10):
             link = title_tag['href']
             print(f"📄 Artikel ke-{i+1}: {link}")
 
-            detail_soup = get_content(link)
+            detail_soup = get_content(link, stop_after=[('time', 'entry-date'), ('div', 'content')])
             if not detail_soup:
                 continue
 
@@ -79,25 +203,22 @@ def parse_presmedia(keyword=None, start_date=None, end_date=None, max_pages=10):
             print(f"📅 Tanggal: {tanggal}")
             print(f"📛 Judul: {judul}")
             
-            results.append({
-                "judul": judul,
-                "link": link,
-                "tanggal": tanggal,
-                "isi": isi
-            })
-            time.sleep(0.5)
+            results.append(judul=judul, link=link, tanggal=tanggal, isi=isi)
+            _polite_delay()
             
     print(f"✅ Total artikel Presmedia berhasil diambil: {len(results)}")
     return results
 
 # --- Parser for Sketsa News ---
-def parse_sketsanews(keyword=None, start_date=None, end_date=None, max_pages=10):
+def parse_sketsanews(keyword=None, start_date=None, end_date=None, max_pages=10, progress=None, compress_isi=False):
     # Note: This parser is very similar to Presmedia and also ignores the 'keyword'.
-    results = []
+    results = ArticleCollection(portal="Sketsa News", compress_isi=compress_isi)
     # The URL structure from the notebook seems to be for a specific sub-category.
     base_url = "https://sketsanews.id/category/3/31/page/"
 
     for page in range(1, max_pages + 1):
+        if progress:
+            progress(page - 1, max_pages, len(results))
         url = f"{base_url}{page}"
         print(f"🔎 Mengambil halaman Sketsa News: {url}")
         soup = get_content(url)
@@ -117,7 +238,7 @@ def parse_sketsanews(keyword=None, start_date=None, end_date=None, max_pages=10)
             link = title_tag['href']
             print(f"📄 Artikel ke-{i+1}: {link}")
 
-            detail_soup = get_content(link)
+            detail_soup = get_content(link, stop_after=[('time', 'entry-date'), ('div', 'content')])
             if not detail_soup:
                 continue
 
@@ -145,23 +266,20 @@ def parse_sketsanews(keyword=None, start_date=None, end_date=None, max_pages=10)
             print(f"📅 Tanggal: {tanggal}")
             print(f"📛 Judul: {judul}")
 
-            results.append({
-                "judul": judul,
-                "link": link,
-                "tanggal": tanggal,
-                "isi": isi
-            })
-            time.sleep(0.5)
+            results.append(judul=judul, link=link, tanggal=tanggal, isi=isi)
+            _polite_delay()
 
     print(f"✅ Total artikel Sketsa News berhasil diambil: {len(results)}")
     return results
 
 # --- Parser for Vision News ---
-def parse_vnews(keyword=None, start_date=None, end_date=None, max_pages=10):
-    results = []
+def parse_vnews(keyword=None, start_date=None, end_date=None, max_pages=10, progress=None, compress_isi=False):
+    results = ArticleCollection(portal="Vision News", compress_isi=compress_isi)
     base_url = "https://www.vnews.click/category/kepri/tanjungpinang/page/"
 
     for page in range(1, max_pages + 1):
+        if progress:
+            progress(page - 1, max_pages, len(results))
         url = f"{base_url}{page}/"
         print(f"🔎 Mengambil halaman Vision News: {url}")
         soup = get_content(url)
@@ -199,7 +317,7 @@ def parse_vnews(keyword=None, start_date=None, end_date=None, max_pages=10):
                     continue
 
             print(f"📄 Artikel ke-{i+1}: {link}")
-            detail_soup = get_content(link)
+            detail_soup = get_content(link, stop_after=[('h1', 'entry-title'), ('div', 'entry-content')])
             if not detail_soup:
                 continue
 
@@ -213,23 +331,20 @@ def parse_vnews(keyword=None, start_date=None, end_date=None, max_pages=10):
             print(f"📅 Tanggal: {tanggal}")
             print(f"📛 Judul: {judul}")
 
-            results.append({
-                "judul": judul,
-                "link": link,
-                "tanggal": tanggal,
-                "isi": isi
-            })
-            time.sleep(0.5)
+            results.append(judul=judul, link=link, tanggal=tanggal, isi=isi)
+            _polite_delay()
 
     print(f"✅ Total artikel Vision News berhasil diambil: {len(results)}")
     return results
 
 # --- Parser for KepriPedia ---
-def parse_kepripedia(keyword=None, start_date=None, end_date=None, max_pages=10):
-    results = []
+def parse_kepripedia(keyword=None, start_date=None, end_date=None, max_pages=10, progress=None, compress_isi=False):
+    results = ArticleCollection(portal="KepriPedia", compress_isi=compress_isi)
     base_url = "https://kepripedia.com/category/tanjungpinang/page/"
 
     for page in range(1, max_pages + 1):
+        if progress:
+            progress(page - 1, max_pages, len(results))
         url = f"{base_url}{page}/"
         print(f"🔎 Mengambil halaman KepriPedia: {url}")
         soup = get_content(url)
@@ -266,7 +381,7 @@ def parse_kepripedia(keyword=None, start_date=None, end_date=None, max_pages=10)
                     continue
             
             print(f"📄 Artikel ke-{i+1}: {link}")
-            detail_soup = get_content(link)
+            detail_soup = get_content(link, stop_after=[('h1', 'tdb-title-text'), ('div', 'tdb-block-inner td-fix-index')])
             if not detail_soup:
                 continue
 
@@ -280,23 +395,20 @@ def parse_kepripedia(keyword=None, start_date=None, end_date=None, max_pages=10)
             print(f"📅 Tanggal: {tanggal}")
             print(f"📛 Judul: {judul}")
 
-            results.append({
-                "judul": judul,
-                "link": link,
-                "tanggal": tanggal,
-                "isi": isi
-            })
-            time.sleep(0.5)
+            results.append(judul=judul, link=link, tanggal=tanggal, isi=isi)
+            _polite_delay()
 
     print(f"✅ Total artikel KepriPedia berhasil diambil: {len(results)}")
     return results
 
 # --- Parser for Harian Kepri ---
-def parse_hariankepri(keyword=None, start_date=None, end_date=None, max_pages=10):
-    results = []
+def parse_hariankepri(keyword=None, start_date=None, end_date=None, max_pages=10, progress=None, compress_isi=False):
+    results = ArticleCollection(portal="Harian Kepri", compress_isi=compress_isi)
     base_url = "https://www.hariankepri.com/kanal/daerah/tanjungpinang/page/"
     
     for page in range(1, max_pages + 1):
+        if progress:
+            progress(page - 1, max_pages, len(results))
         url = f"{base_url}{page}/"
         print(f"🔎 Mengambil halaman Harian Kepri: {url}")
         soup = get_content(url)
@@ -320,7 +432,7 @@ def parse_hariankepri(keyword=None, start_date=None, end_date=None, max_pages=10
             link = title_tag['href']
             print(f"📄 Artikel ke-{i+1}: {link}")
             
-            detail_soup = get_content(link)
+            detail_soup = get_content(link, stop_after=[('time', 'entry-date'), ('h1', 'tdb-title-text'), ('div', 'td-post-content')])
             if not detail_soup:
                 continue
 
@@ -351,25 +463,22 @@ def parse_hariankepri(keyword=None, start_date=None, end_date=None, max_pages=10
             print(f"📅 Tanggal: {tanggal}")
             print(f"📛 Judul: {judul}")
 
-            results.append({
-                "judul": judul,
-                "link": link,
-                "tanggal": tanggal,
-                "isi": isi
-            })
-            time.sleep(0.5)
+            results.append(judul=judul, link=link, tanggal=tanggal, isi=isi)
+            _polite_delay()
 
     print(f"✅ Total artikel Harian Kepri berhasil diambil: {len(results)}")
     return results
 
 # --- Parser for Seputar Kita (REVISED) ---
-def parse_seputarkita(keyword=None, start_date=None, end_date=None, max_pages=10):
+def parse_seputarkita(keyword=None, start_date=None, end_date=None, max_pages=10, progress=None, compress_isi=False):
     # Note: 'keyword' tidak digunakan karena URL sudah spesifik ke kategori Tanjungpinang.
-    results = []
+    results = ArticleCollection(portal="Seputar Kita", compress_isi=compress_isi)
     # FIXED: URL disesuaikan dengan struktur baru dari kode Anda.
     base_url = "https://www.seputarkita.co/category/daerah/tanjungpinang/page/"
 
     for page in range(1, max_pages + 1):
+        if progress:
+            progress(page - 1, max_pages, len(results))
         url = f"{base_url}{page}/"
         print(f"🔎 Mengambil halaman Seputar Kita: {url}")
         soup = get_content(url)
@@ -402,7 +511,7 @@ def parse_seputarkita(keyword=None, start_date=None, end_date=None, max_pages=10
                 continue
             
             print(f"📄 Artikel ke-{i+1}: {link}")
-            detail_soup = get_content(link)
+            detail_soup = get_content(link, stop_after=[('time', 'entry-date'), ('div', 'td-post-content')])
             if not detail_soup:
                 continue
             
@@ -435,24 +544,21 @@ def parse_seputarkita(keyword=None, start_date=None, end_date=None, max_pages=10
             print(f"📅 Tanggal: {tanggal}")
             print(f"📛 Judul: {judul}")
             
-            results.append({
-                "judul": judul,
-                "link": link,
-                "tanggal": tanggal,
-                "isi": isi
-            })
-            time.sleep(0.5)
+            results.append(judul=judul, link=link, tanggal=tanggal, isi=isi)
+            _polite_delay()
 
     print(f"✅ Total artikel Seputar Kita berhasil diambil: {len(results)}")
     return results
 
 # --- Parser for Zona Kepri (REVISED) ---
-def parse_zonakepri(keyword=None, start_date=None, end_date=None, max_pages=10):
-    results = []
+def parse_zonakepri(keyword=None, start_date=None, end_date=None, max_pages=10, progress=None, compress_isi=False):
+    results = ArticleCollection(portal="Zona Kepri", compress_isi=compress_isi)
     # FIXED: URL disesuaikan dengan struktur baru dari kode Anda.
     base_url = "https://zonakepri.com/category/zona-kepri/tanjungpinang/page/"
 
     for page in range(1, max_pages + 1):
+        if progress:
+            progress(page - 1, max_pages, len(results))
         url = f"{base_url}{page}/"
         print(f"🔎 Mengambil halaman Zona Kepri: {url}")
         soup = get_content(url)
@@ -484,7 +590,7 @@ def parse_zonakepri(keyword=None, start_date=None, end_date=None, max_pages=10):
                 continue
             
             print(f"📄 Artikel ke-{i+1}: {link}")
-            detail_soup = get_content(link)
+            detail_soup = get_content(link, stop_after=[('time', 'entry-date'), ('div', 'td-post-content')])
             if not detail_soup:
                 continue
 
@@ -517,13 +623,8 @@ def parse_zonakepri(keyword=None, start_date=None, end_date=None, max_pages=10):
             print(f"📅 Tanggal: {tanggal}")
             print(f"📛 Judul: {judul}")
 
-            results.append({
-                "judul": judul,
-                "link": link,
-                "tanggal": tanggal,
-                "isi": isi
-            })
-            time.sleep(0.5)
+            results.append(judul=judul, link=link, tanggal=tanggal, isi=isi)
+            _polite_delay()
 
     print(f"✅ Total artikel Zona Kepri berhasil diambil: {len(results)}")
     return results
@@ -531,13 +632,15 @@ def parse_zonakepri(keyword=None, start_date=None, end_date=None, max_pages=10):
 # --- Parser for Ulasan (REVISED) ---
 # GANTIKAN FUNGSI LAMA DENGAN YANG INI DI DALAM parsers.py
 
-def parse_ulasan(keyword=None, start_date=None, end_date=None, max_pages=10):
-    results = []
+def parse_ulasan(keyword=None, start_date=None, end_date=None, max_pages=10, progress=None, compress_isi=False):
+    results = ArticleCollection(portal="Ulasan", compress_isi=compress_isi)
     # FIXED: URL disesuaikan dengan struktur baru dari kode Anda.
     # Mengarah ke kategori Tanjungpinang yang lebih spesifik.
     base_url = "https://ulasan.co/category/kepri/tanjungpinang/page/"
 
     for page in range(1, max_pages + 1):
+        if progress:
+            progress(page - 1, max_pages, len(results))
         url = f"{base_url}{page}/"
         print(f"🔎 Mengambil halaman Ulasan.co: {url}")
         soup = get_content(url)
@@ -568,7 +671,7 @@ def parse_ulasan(keyword=None, start_date=None, end_date=None, max_pages=10):
                 continue
 
             print(f"📄 Artikel ke-{i+1}: {link}")
-            detail_soup = get_content(link)
+            detail_soup = get_content(link, stop_after=[('time', 'entry-date'), ('div', 'entry-content')])
             if not detail_soup:
                 continue
 
@@ -600,13 +703,8 @@ def parse_ulasan(keyword=None, start_date=None, end_date=None, max_pages=10):
             print(f"📅 Tanggal: {tanggal}")
             print(f"📛 Judul: {judul}")
 
-            results.append({
-                "judul": judul,
-                "link": link,
-                "tanggal": tanggal,
-                "isi": isi
-            })
-            time.sleep(0.5)
+            results.append(judul=judul, link=link, tanggal=tanggal, isi=isi)
+            _polite_delay()
 
     print(f"✅ Total artikel Ulasan.co berhasil diambil: {len(results)}")
     return results
@@ -614,12 +712,14 @@ def parse_ulasan(keyword=None, start_date=None, end_date=None, max_pages=10):
 # --- Parser for Batampos (REVISED) ---
 # GANTIKAN FUNGSI LAMA DENGAN YANG INI DI DALAM parsers.py
 
-def parse_batampos(keyword=None, start_date=None, end_date=None, max_pages=10):
-    results = []
+def parse_batampos(keyword=None, start_date=None, end_date=None, max_pages=10, progress=None, compress_isi=False):
+    results = ArticleCollection(portal="Batampos", compress_isi=compress_isi)
     # FIXED: URL disesuaikan dengan struktur subdomain baru dari kode Anda.
     base_url = "https://kepri.batampos.co.id/rubrik/tanjungpinang/page/"
 
     for page in range(1, max_pages + 1):
+        if progress:
+            progress(page - 1, max_pages, len(results))
         url = f"{base_url}{page}/"
         print(f"🔎 Mengambil halaman Batampos: {url}")
         soup = get_content(url)
@@ -650,7 +750,7 @@ def parse_batampos(keyword=None, start_date=None, end_date=None, max_pages=10):
                 continue
 
             print(f"📄 Artikel ke-{i+1}: {link}")
-            detail_soup = get_content(link)
+            detail_soup = get_content(link, stop_after=[('time', 'entry-date'), ('div', 'td-post-content')])
             if not detail_soup:
                 continue
 
@@ -682,13 +782,8 @@ def parse_batampos(keyword=None, start_date=None, end_date=None, max_pages=10):
             print(f"📅 Tanggal: {tanggal}")
             print(f"📛 Judul: {judul}")
 
-            results.append({
-                "judul": judul,
-                "link": link,
-                "tanggal": tanggal,
-                "isi": isi
-            })
-            time.sleep(0.5)
+            results.append(judul=judul, link=link, tanggal=tanggal, isi=isi)
+            _polite_delay()
 
     print(f"✅ Total artikel Batampos berhasil diambil: {len(results)}")
     return results
\ No newline at end of file
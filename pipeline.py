@@ -0,0 +1,104 @@
+from contextlib import nullcontext
+from classifier import classify_articles
+from parsers import archive_context
+from records import ArticleCollection
+from parsers import (
+    parse_presmedia, parse_sketsanews, parse_vnews,
+    parse_kepripedia, parse_hariankepri, parse_seputarkita,
+    parse_zonakepri, parse_ulasan, parse_batampos
+)
+
+PARSER_MAP = {
+    "Presmedia": parse_presmedia, "Sketsa News": parse_sketsanews, "Vision News": parse_vnews,
+    "KepriPedia": parse_kepripedia, "Harian Kepri": parse_hariankepri, "Seputar Kita": parse_seputarkita,
+    "Zona Kepri": parse_zonakepri, "Ulasan": parse_ulasan, "Batampos": parse_batampos
+}
+PORTALS = list(PARSER_MAP)
+
+def scrape_portal(portal, start_date, end_date, max_pages, progress=None, archive=None, offline=False, as_of=None,
+                  compress_isi=False):
+    """
+    Menjalankan parser untuk portal yang dipilih.
+    Mengembalikan ArticleCollection (atau list kosong jika portal tidak dikenal).
+    `progress(halaman_selesai, max_pages, jumlah_artikel)` dipanggil di awal setiap halaman.
+
+    Jika `archive` (HtmlArchive) diberikan, semua respons HTML diarsipkan; dengan
+    `offline=True` halaman dibaca dari arsip tanpa akses jaringan (lihat reextract_portal).
+    `compress_isi=True` menyimpan isi artikel terkompresi sampai dibutuhkan.
+    """
+    parse_function = PARSER_MAP.get(portal)
+    if not parse_function:
+        return []
+    if archive is not None and offline:
+        return reextract_portal(portal, start_date, end_date, max_pages, archive, as_of=as_of, progress=progress,
+                                compress_isi=compress_isi)
+    with archive_context(archive, portal=portal) if archive is not None else nullcontext():
+        return parse_function(keyword=None, start_date=start_date, end_date=end_date, max_pages=max_pages, progress=progress,
+                              compress_isi=compress_isi)
+
+def reextract_portal(portal, start_date, end_date, max_pages, archive, as_of=None, progress=None, compress_isi=False):
+    """
+    Menjalankan ulang parser portal atas HTML yang diarsipkan, sekali untuk
+    setiap run scraping di arsip (pada atau sebelum `as_of`), dari yang terbaru.
+    Setiap run memakai halaman daftar dan detail yang diambil saat itu, sehingga
+    artikel yang sudah bergeser dari halaman daftar terbaru tetap ditemukan.
+    Artikel yang muncul di beberapa run diambil dari run terbaru.
+    `progress(run_selesai, jumlah_run, jumlah_artikel)` dipanggil per run.
+    """
+    parse_function = PARSER_MAP[portal]
+    results = ArticleCollection(portal=portal, compress_isi=compress_isi)
+    seen_links = set()
+    runs = archive.runs(as_of, portal=portal)
+    for i, run in enumerate(reversed(runs)):
+        if progress:
+            progress(i, len(runs), len(results))
+        print(f"🗄️ Re-ekstraksi {portal} dari run arsip {run} ({i + 1}/{len(runs)})")
+        with archive_context(archive, offline=True, as_of=as_of, run=run):
+            hasil = parse_function(keyword=None, start_date=start_date, end_date=end_date, max_pages=max_pages)
+        for article in hasil:
+            if article.link in seen_links:
+                continue
+            seen_links.add(article.link)
+            results.append(judul=article.judul, link=article.link, tanggal=article.tanggal, isi=article.isi,
+                           portal=article.portal)
+    return results
+
+def classify_collection(hasil, categories=None, category_tree=None, parallel=False):
+    """
+    Mengklasifikasikan artikel hasil scraping.
+    Jika `category_tree` diberikan, klasifikasi hierarkis dipakai; jika hanya
+    `categories`, klasifikasi datar. Mengembalikan (kategori_list, sektor_list);
+    keduanya None jika tidak ada klasifikasi yang dijalankan.
+    """
+    if category_tree:
+        pasangan_list = classify_articles(hasil.iter_isi(), category_tree, parallel=parallel, hierarchical=True)
+        sektor_list = [[sektor for sektor, _ in pasangan] for pasangan in pasangan_list]
+        kategori_list = [[kategori for _, kategori in pasangan] for pasangan in pasangan_list]
+        return kategori_list, sektor_list
+    if categories:
+        return classify_articles(hasil.iter_isi(), categories, parallel=parallel), None
+    return None, None
+
+def run_pipeline(portal, start_date, end_date, max_pages, categories=None, category_tree=None, parallel=False, progress=None,
+                 archive=None, offline=False, as_of=None, store=None, compress_isi=False):
+    """
+    Scraping, klasifikasi, dan pembentukan DataFrame dalam satu langkah.
+    Mengembalikan (hasil, df); df bernilai None jika tidak ada artikel.
+
+    Jika `store` (ArticleStore) diberikan, artikel disimpan dan diklasifikasikan
+    oleh store sehingga indeks keyword-nya ikut terbentuk. Store hanya
+    mendukung klasifikasi datar; klasifikasinya selalu berjalan di satu proses.
+    """
+    if store is not None and (category_tree or not categories):
+        raise ValueError("Basis data artikel hanya bisa dipakai dengan klasifikasi datar (bukan hierarkis atau tanpa klasifikasi).")
+    if store is not None and parallel:
+        print("⚠️ Klasifikasi paralel diabaikan: artikel diklasifikasikan oleh basis data artikel.")
+    hasil = scrape_portal(portal, start_date, end_date, max_pages, progress=progress, archive=archive, offline=offline, as_of=as_of,
+                          compress_isi=compress_isi)
+    if not hasil:
+        return hasil, None
+    if store is not None:
+        kategori_list, sektor_list = store.add_batch(hasil, categories), None
+    else:
+        kategori_list, sektor_list = classify_collection(hasil, categories, category_tree, parallel)
+    return hasil, hasil.to_dataframe(kategori_list, sektor_list)
@@ -0,0 +1,100 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+DEFAULT_INTERVAL = 0.005
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class SamplingProfiler:
+    """
+    Profiler sampling sederhana berbasis thread.
+
+    Selama blok `with` berjalan, sebuah thread latar mengambil stack dari
+    thread pemanggil setiap `interval` detik. Waktu yang dihabiskan menunggu
+    jaringan tetap terlihat (misalnya di socket recv), berbeda dengan cProfile
+    yang hanya mengukur pemanggilan fungsi Python. Proses worker klasifikasi
+    paralel tidak ikut disampel.
+    """
+    def __init__(self, interval=DEFAULT_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.duration = 0.0
+        self._target_id = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._started_at = None
+
+    def __enter__(self):
+        self._target_id = threading.get_ident()
+        self._stop.clear()
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self._started_at
+        return False
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            # Disimpan dari akar ke daun, sesuai format flamegraph
+            self.stacks[tuple(reversed(stack))] += 1
+            self.samples += 1
+
+    def folded(self):
+        """
+        Mengembalikan hasil dalam format "folded stacks" (satu baris per stack:
+        `akar;...;daun jumlah`) yang dapat dibuka dengan flamegraph.pl atau speedscope.
+        """
+        return "\n".join(f"{';'.join(stack)} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+    def top_functions(self, limit=15):
+        """
+        Mengembalikan fungsi terpanas sebagai list dictionary, diurutkan dari
+        jumlah sampel "self" (sedang dieksekusi) lalu "total" (ada di stack).
+        """
+        self_counts = Counter()
+        total_counts = Counter()
+        for stack, count in self.stacks.items():
+            self_counts[stack[-1]] += count
+            for label in set(stack):
+                total_counts[label] += count
+
+        total = self.samples or 1
+        rows = [
+            {
+                "fungsi": label,
+                "self": self_counts[label],
+                "total": total_counts[label],
+                "self %": round(100 * self_counts[label] / total, 1),
+                "total %": round(100 * total_counts[label] / total, 1),
+            }
+            for label in total_counts
+        ]
+        rows.sort(key=lambda row: (row["self"], row["total"]), reverse=True)
+        return rows[:limit]
+
+    def format_top(self, limit=15):
+        """
+        Ringkasan teks fungsi terpanas, untuk ditampilkan di terminal.
+        """
+        lines = [f"{self.samples} sampel dalam {self.duration:.1f} detik", f"{'self %':>7} {'total %':>8}  fungsi"]
+        for row in self.top_functions(limit):
+            lines.append(f"{row['self %']:>7} {row['total %']:>8}  {row['fungsi']}")
+        return "\n".join(lines)
@@ -0,0 +1,86 @@
+import sys
+import zlib
+import pandas as pd
+
+# Kolom keluaran standar, sama seperti tabel hasil di aplikasi
+KATEGORI_COLUMNS = ['Kategori 1', 'Kategori 2', 'Kategori 3']
+SEKTOR_COLUMNS = ['Sektor 1', 'Sektor 2', 'Sektor 3']
+
+class Article:
+    """
+    Representasi ringkas satu artikel berita.
+    Memakai __slots__ sehingga tidak ada __dict__ per artikel. Dengan
+    `compress=True` isi disimpan terkompresi (zlib) dan baru didekompresi
+    saat dibaca.
+    """
+    __slots__ = ('judul', 'link', 'tanggal', 'portal', '_isi')
+
+    def __init__(self, judul, link, tanggal, isi, portal=None, compress=False):
+        self.judul = judul
+        self.link = link
+        self.tanggal = tanggal
+        self.portal = portal
+        self._isi = zlib.compress(isi.encode('utf-8')) if compress and isi else isi
+
+    @property
+    def isi(self):
+        if isinstance(self._isi, bytes):
+            return zlib.decompress(self._isi).decode('utf-8')
+        return self._isi
+
+    def __repr__(self):
+        return f"Article(portal={self.portal!r}, tanggal={self.tanggal!r}, judul={self.judul!r})"
+
+class ArticleCollection:
+    """
+    Wadah hasil scraping untuk satu portal.
+    Nama portal di-intern dan artikel di hari yang sama berbagi satu objek
+    tanggal. DataFrame hanya dibangun sekali di akhir (to_dataframe),
+    termasuk kolom kategori, tanpa salinan perantara.
+
+    Dengan `compress_isi=True` isi setiap artikel disimpan terkompresi sampai
+    dibutuhkan (klasifikasi atau to_dataframe), untuk scraping dalam jumlah besar.
+    """
+    def __init__(self, portal=None, compress_isi=False):
+        self.portal = sys.intern(portal) if portal else None
+        self.compress_isi = compress_isi
+        self.articles = []
+        self._dates = {}
+
+    def append(self, judul, link, tanggal, isi, portal=None):
+        if tanggal is not None:
+            tanggal = self._dates.setdefault(tanggal, tanggal)
+        portal = sys.intern(portal) if portal else self.portal
+        article = Article(judul, link, tanggal, isi, portal=portal, compress=self.compress_isi)
+        self.articles.append(article)
+        return article
+
+    def __len__(self):
+        return len(self.articles)
+
+    def __iter__(self):
+        return iter(self.articles)
+
+    def iter_isi(self):
+        """
+        Menghasilkan isi artikel satu per satu (didekompresi secara bertahap).
+        """
+        return (article.isi for article in self.articles)
+
+    def to_dataframe(self, kategori=None, sektor=None):
+        """
+        Membangun DataFrame hasil. Jika `kategori` (list hasil klasifikasi,
+        sejajar dengan artikel) diberikan, kolom Kategori 1-3 ditambahkan di depan.
+        Hasil klasifikasi hierarkis juga menambahkan kolom Sektor 1-3 lewat `sektor`.
+        """
+        columns = {}
+        for labels_list, column_names in ((kategori, KATEGORI_COLUMNS), (sektor, SEKTOR_COLUMNS)):
+            if labels_list is None:
+                continue
+            for i, col_name in enumerate(column_names):
+                columns[col_name] = [labels[i] if i < len(labels) else '' for labels in labels_list]
+        columns['tanggal'] = [article.tanggal for article in self.articles]
+        columns['judul'] = [article.judul for article in self.articles]
+        columns['isi'] = list(self.iter_isi())
+        columns['link'] = [article.link for article in self.articles]
+        return pd.DataFrame(columns)
@@ -0,0 +1,453 @@
+import os
+import sqlite3
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from classifier import keyword_pattern, rank_categories, NON_PDRB_LABEL
+
+STORE_PATH = os.path.join("data", "berita.sqlite3")
+
+# Batas jumlah parameter per query (SQLITE_MAX_VARIABLE_NUMBER lama = 999)
+_SQL_CHUNK = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    link TEXT NOT NULL UNIQUE,
+    portal TEXT,
+    tanggal TEXT,
+    judul TEXT,
+    isi TEXT,
+    kategori_1 TEXT,
+    kategori_2 TEXT,
+    kategori_3 TEXT
+);
+CREATE TABLE IF NOT EXISTS category_keywords (
+    category TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    PRIMARY KEY (category, keyword)
+);
+CREATE TABLE IF NOT EXISTS category_order (
+    category TEXT PRIMARY KEY,
+    position INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS keyword_hits (
+    category TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    article_id INTEGER NOT NULL,
+    PRIMARY KEY (category, keyword, article_id)
+);
+CREATE INDEX IF NOT EXISTS keyword_hits_article ON keyword_hits (article_id);
+CREATE TABLE IF NOT EXISTS rollup_category_daily (
+    portal TEXT NOT NULL,
+    tanggal TEXT NOT NULL,
+    category TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (portal, tanggal, category)
+);
+CREATE TABLE IF NOT EXISTS rollup_portal_daily (
+    portal TEXT NOT NULL,
+    tanggal TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (portal, tanggal)
+);
+"""
+
+# Ekspresi SQL untuk awal periode agregasi: harian, mingguan (Senin), bulanan
+_PERIODS = {
+    "D": "tanggal",
+    "W": "date(tanggal, 'weekday 0', '-6 days')",
+    "M": "substr(tanggal, 1, 7) || '-01'",
+}
+
+def _chunks(items, size=_SQL_CHUNK):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def _labels_of(row):
+    return [label for label in row if label]
+
+class ArticleStore:
+    """
+    Basis data artikel (SQLite) beserta hasil klasifikasinya.
+
+    Selain Kategori 1-3, tabel keyword_hits menyimpan indeks terbalik
+    keyword -> artikel (keyword mana yang cocok di artikel mana), dan
+    category_keywords menyimpan set keyword yang dipakai saat klasifikasi.
+    Dengan keduanya, perubahan file kategori cukup diproses untuk artikel yang
+    skornya memang bisa berubah (lihat sync_categories).
+
+    Tabel rollup_* menyimpan jumlah berita per portal, hari, dan kategori.
+    Tabel ini diperbarui setiap kali label artikel berubah, sehingga query tren
+    tidak perlu membaca tabel artikel.
+    """
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        # Menyerialkan penulisan dari beberapa thread job dalam satu proses
+        self._write_lock = threading.RLock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            # Basis data lama yang belum punya rollup diisi sekali dari tabel artikel
+            if not conn.execute("SELECT 1 FROM rollup_portal_daily LIMIT 1").fetchone() \
+                    and conn.execute("SELECT 1 FROM articles WHERE kategori_1 IS NOT NULL LIMIT 1").fetchone():
+                self._rebuild_rollups(conn)
+
+    @contextmanager
+    def _connect(self, immediate=False):
+        # Satu koneksi per operasi (satu transaksi). Dengan `immediate`, kunci
+        # tulis diambil di awal transaksi (BEGIN IMMEDIATE), sehingga baris yang
+        # dibaca tidak bisa diubah penulis lain (thread atau proses) sebelum commit.
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            if immediate:
+                conn.execute("BEGIN IMMEDIATE")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # --- Keyword snapshot ---
+
+    def _load_snapshot(self, conn):
+        snapshot = defaultdict(set)
+        for category, keyword in conn.execute("SELECT category, keyword FROM category_keywords"):
+            snapshot[category].add(keyword)
+        order = [category for category, in conn.execute("SELECT category FROM category_order ORDER BY position")]
+        return snapshot, order
+
+    def _save_snapshot(self, conn, categories):
+        conn.execute("DELETE FROM category_keywords")
+        conn.executemany(
+            "INSERT INTO category_keywords (category, keyword) VALUES (?, ?)",
+            [(category, keyword) for category, keywords in categories.items() for keyword in set(keywords)]
+        )
+        conn.execute("DELETE FROM category_order")
+        conn.executemany(
+            "INSERT INTO category_order (category, position) VALUES (?, ?)",
+            [(category, position) for position, category in enumerate(categories)]
+        )
+
+    # --- Scoring ---
+
+    def _rank_articles(self, conn, article_ids, category_order):
+        """
+        Menghitung ulang Kategori 1-3 dari keyword_hits untuk artikel tertentu.
+        Mengembalikan {article_id: [kategori]}.
+        """
+        scores = {article_id: {} for article_id in article_ids}
+        for chunk in _chunks(article_ids):
+            placeholders = ",".join("?" * len(chunk))
+            for article_id, category, count in conn.execute(
+                f"SELECT article_id, category, COUNT(*) FROM keyword_hits "
+                f"WHERE article_id IN ({placeholders}) GROUP BY article_id, category", chunk
+            ):
+                scores[article_id][category] = count
+        return {article_id: rank_categories(article_scores, category_order) for article_id, article_scores in scores.items()}
+
+    def _write_labels(self, conn, new_labels):
+        """
+        Menyimpan Kategori 1-3 baru dan memperbarui tabel rollup sesuai selisihnya.
+        Mengembalikan list perubahan (article_id, label_lama, label_baru) untuk
+        artikel yang labelnya berubah.
+        """
+        changes = []
+        category_deltas = defaultdict(int)
+        portal_deltas = defaultdict(int)
+        for chunk in _chunks(new_labels):
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT id, portal, tanggal, kategori_1, kategori_2, kategori_3 FROM articles WHERE id IN ({placeholders})", chunk
+            ).fetchall()
+            for article_id, portal, tanggal, *old in rows:
+                old_labels = _labels_of(old)
+                labels = new_labels[article_id]
+                if old_labels == labels:
+                    continue
+                changes.append((article_id, old_labels, labels))
+                key = (portal or "", tanggal or "")
+                for label in old_labels:
+                    category_deltas[key + (label,)] -= 1
+                for label in labels:
+                    category_deltas[key + (label,)] += 1
+                if not old_labels:
+                    portal_deltas[key] += 1
+        conn.executemany(
+            "UPDATE articles SET kategori_1 = ?, kategori_2 = ?, kategori_3 = ? WHERE id = ?",
+            [tuple((labels + ['', '', ''])[:3]) + (article_id,) for article_id, _, labels in changes]
+        )
+        self._apply_rollup_deltas(conn, category_deltas, portal_deltas)
+        return changes
+
+    # --- Rollups ---
+
+    def _apply_rollup_deltas(self, conn, category_deltas, portal_deltas):
+        conn.executemany(
+            "INSERT INTO rollup_category_daily (portal, tanggal, category, n) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (portal, tanggal, category) DO UPDATE SET n = n + excluded.n",
+            [key + (delta,) for key, delta in category_deltas.items() if delta]
+        )
+        conn.executemany(
+            "INSERT INTO rollup_portal_daily (portal, tanggal, n) VALUES (?, ?, ?) "
+            "ON CONFLICT (portal, tanggal) DO UPDATE SET n = n + excluded.n",
+            [key + (delta,) for key, delta in portal_deltas.items() if delta]
+        )
+        # Baris yang jumlahnya menjadi nol dihapus, hanya untuk kunci yang berubah
+        conn.executemany(
+            "DELETE FROM rollup_category_daily WHERE portal = ? AND tanggal = ? AND category = ? AND n <= 0",
+            [key for key, delta in category_deltas.items() if delta < 0]
+        )
+        conn.executemany(
+            "DELETE FROM rollup_portal_daily WHERE portal = ? AND tanggal = ? AND n <= 0",
+            [key for key, delta in portal_deltas.items() if delta < 0]
+        )
+
+    def _unclassify(self, conn, article_id):
+        """
+        Mengurangi kontribusi artikel dari rollup dan mengosongkan labelnya,
+        sebelum artikel tersebut diperbarui dan diklasifikasikan ulang.
+        """
+        portal, tanggal, *old = conn.execute(
+            "SELECT portal, tanggal, kategori_1, kategori_2, kategori_3 FROM articles WHERE id = ?", (article_id,)
+        ).fetchone()
+        old_labels = _labels_of(old)
+        if not old_labels:
+            return
+        key = (portal or "", tanggal or "")
+        self._apply_rollup_deltas(conn, {key + (label,): -1 for label in old_labels}, {key: -1})
+        conn.execute("UPDATE articles SET kategori_1 = NULL, kategori_2 = NULL, kategori_3 = NULL WHERE id = ?", (article_id,))
+
+    def _rebuild_rollups(self, conn):
+        conn.execute("DELETE FROM rollup_category_daily")
+        conn.execute("DELETE FROM rollup_portal_daily")
+        conn.execute("""
+            INSERT INTO rollup_category_daily (portal, tanggal, category, n)
+            SELECT portal, tanggal, category, COUNT(*) FROM (
+                SELECT COALESCE(portal, '') AS portal, COALESCE(tanggal, '') AS tanggal, kategori_1 AS category FROM articles
+                UNION ALL
+                SELECT COALESCE(portal, ''), COALESCE(tanggal, ''), kategori_2 FROM articles
+                UNION ALL
+                SELECT COALESCE(portal, ''), COALESCE(tanggal, ''), kategori_3 FROM articles
+            ) WHERE category IS NOT NULL AND category != ''
+            GROUP BY portal, tanggal, category
+        """)
+        conn.execute("""
+            INSERT INTO rollup_portal_daily (portal, tanggal, n)
+            SELECT COALESCE(portal, ''), COALESCE(tanggal, ''), COUNT(*) FROM articles
+            WHERE kategori_1 IS NOT NULL AND kategori_1 != ''
+            GROUP BY COALESCE(portal, ''), COALESCE(tanggal, '')
+        """)
+
+    # --- Public API ---
+
+    def add_batch(self, hasil, categories):
+        """
+        Menyimpan artikel hasil scraping (ArticleCollection) dan
+        mengklasifikasikannya. Artikel dengan link yang sudah ada diperbarui.
+        Mengembalikan list Kategori sejajar dengan urutan artikel.
+
+        Pencocokan keyword (bagian terberat) dikerjakan sebelum transaksi tulis
+        dibuka, agar kunci basis data hanya dipegang selama penulisan.
+        """
+        matchers = [
+            (category, [(keyword, keyword_pattern(keyword)) for keyword in keywords])
+            for category, keywords in categories.items()
+        ]
+        category_order = list(categories)
+
+        scored = []
+        for article in hasil:
+            isi = article.isi
+            text_lower = isi.lower() if isinstance(isi, str) else ""
+            hits = [
+                (category, keyword)
+                for category, keyword_matchers in matchers
+                for keyword, pattern in keyword_matchers
+                if pattern.search(text_lower)
+            ]
+            scored.append((article, hits))
+
+        with self._write_lock:
+            self.sync_categories(categories)
+            with self._connect(immediate=True) as conn:
+                article_ids = []
+                for article, hits in scored:
+                    tanggal = article.tanggal.isoformat() if article.tanggal else None
+                    row = conn.execute("SELECT id FROM articles WHERE link = ?", (article.link,)).fetchone()
+                    if row:
+                        self._unclassify(conn, row[0])
+                    article_id = conn.execute(
+                        "INSERT INTO articles (link, portal, tanggal, judul, isi) VALUES (?, ?, ?, ?, ?) "
+                        "ON CONFLICT (link) DO UPDATE SET portal = excluded.portal, tanggal = excluded.tanggal, "
+                        "judul = excluded.judul, isi = excluded.isi RETURNING id",
+                        (article.link, article.portal, tanggal, article.judul, article.isi)
+                    ).fetchone()[0]
+                    conn.execute("DELETE FROM keyword_hits WHERE article_id = ?", (article_id,))
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO keyword_hits (category, keyword, article_id) VALUES (?, ?, ?)",
+                        [(category, keyword, article_id) for category, keyword in hits]
+                    )
+                    article_ids.append(article_id)
+
+                new_labels = self._rank_articles(conn, set(article_ids), category_order)
+                self._write_labels(conn, new_labels)
+        return [new_labels[article_id] for article_id in article_ids]
+
+    def sync_categories(self, categories):
+        """
+        Menyesuaikan klasifikasi tersimpan dengan set keyword yang baru.
+
+        Keyword yang dihapus: artikel terdampak diambil dari indeks terbalik
+        keyword_hits. Keyword yang ditambahkan: jika keyword yang sama sudah
+        terindeks di kategori lain, hasilnya disalin dari indeks; jika belum,
+        hanya artikel yang memuat teks keyword (instr) yang diperiksa dengan regex.
+        Hanya artikel terdampak yang dihitung ulang.
+        Mengembalikan list perubahan (article_id, label_lama, label_baru).
+        """
+        with self._write_lock, self._connect(immediate=True) as conn:
+            old_snapshot, old_order = self._load_snapshot(conn)
+            new_snapshot = {category: set(keywords) for category, keywords in categories.items()}
+            category_order = list(categories)
+
+            removed = [(c, k) for c, keywords in old_snapshot.items() for k in keywords - new_snapshot.get(c, set())]
+            added = [(c, k) for c, keywords in new_snapshot.items() for k in keywords - old_snapshot.get(c, set())]
+            order_changed = old_order != category_order
+            if not removed and not added and not order_changed:
+                return []
+
+            affected = set()
+
+            # Cari artikel untuk keyword baru sebelum hit lama dihapus,
+            # karena keyword yang pindah kategori masih bisa disalin dari indeks
+            matches = {}
+            for keyword in {k for _, k in added}:
+                known = conn.execute("SELECT DISTINCT article_id FROM keyword_hits WHERE keyword = ?", (keyword,)).fetchall()
+                if known or keyword in {k for keywords in old_snapshot.values() for k in keywords}:
+                    matches[keyword] = {article_id for article_id, in known}
+                else:
+                    pattern = keyword_pattern(keyword)
+                    matches[keyword] = {
+                        article_id
+                        for article_id, isi in conn.execute(
+                            "SELECT id, isi FROM articles WHERE instr(lower(isi), ?) > 0", (keyword,)
+                        )
+                        if pattern.search(isi.lower())
+                    }
+
+            for category, keyword in removed:
+                affected.update(article_id for article_id, in conn.execute(
+                    "SELECT article_id FROM keyword_hits WHERE category = ? AND keyword = ?", (category, keyword)
+                ))
+                conn.execute("DELETE FROM keyword_hits WHERE category = ? AND keyword = ?", (category, keyword))
+
+            for category, keyword in added:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO keyword_hits (category, keyword, article_id) VALUES (?, ?, ?)",
+                    [(category, keyword, article_id) for article_id in matches[keyword]]
+                )
+                affected.update(matches[keyword])
+
+            # Urutan kategori menentukan urutan skor yang sama, jadi artikel
+            # dengan hit di kategori yang posisinya berubah ikut dihitung ulang
+            if order_changed:
+                old_positions = {category: position for position, category in enumerate(old_order)}
+                moved = [category for position, category in enumerate(category_order) if old_positions.get(category) != position]
+                for chunk in _chunks(moved):
+                    placeholders = ",".join("?" * len(chunk))
+                    affected.update(article_id for article_id, in conn.execute(
+                        f"SELECT DISTINCT article_id FROM keyword_hits WHERE category IN ({placeholders})", chunk
+                    ))
+
+            self._save_snapshot(conn, categories)
+            if not affected:
+                return []
+            print(f"🔁 Klasifikasi ulang {len(affected)} artikel terdampak perubahan keyword.")
+            return self._write_labels(conn, self._rank_articles(conn, affected, category_order))
+
+    def labels_by_link(self):
+        """
+        Kategori 1-3 tersimpan untuk setiap artikel, sebagai {link: [kategori]}.
+        """
+        with self._connect() as conn:
+            return {
+                link: _labels_of(labels)
+                for link, *labels in conn.execute("SELECT link, kategori_1, kategori_2, kategori_3 FROM articles")
+            }
+
+    def count(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    # --- Rollup Queries ---
+    # Semua query di bawah hanya membaca tabel rollup, tidak pernah isi artikel.
+
+    def _rollup_filters(self, start_date, end_date, portals, categories=None):
+        clauses = ["tanggal != ''"]
+        params = []
+        if start_date:
+            clauses.append("tanggal >= ?")
+            params.append(str(start_date))
+        if end_date:
+            clauses.append("tanggal <= ?")
+            params.append(str(end_date))
+        for column, values in (("portal", portals), ("category", categories)):
+            if values:
+                clauses.append(f"{column} IN ({','.join('?' * len(values))})")
+                params.extend(values)
+        return " AND ".join(clauses), params
+
+    def category_trend(self, start_date=None, end_date=None, portals=None, categories=None, period="D"):
+        """
+        Jumlah berita per periode dan kategori, dijumlahkan atas portal yang dipilih.
+        `period`: "D" (harian), "W" (mingguan, mulai Senin) atau "M" (bulanan).
+        Mengembalikan list (periode, kategori, jumlah).
+        """
+        where, params = self._rollup_filters(start_date, end_date, portals, categories)
+        with self._connect() as conn:
+            return conn.execute(
+                f"SELECT {_PERIODS[period]} AS periode, category, SUM(n) FROM rollup_category_daily "
+                f"WHERE {where} GROUP BY periode, category ORDER BY periode, category", params
+            ).fetchall()
+
+    def portal_trend(self, start_date=None, end_date=None, portals=None, period="D"):
+        """
+        Jumlah artikel per periode dan portal. Mengembalikan list (periode, portal, jumlah).
+        """
+        where, params = self._rollup_filters(start_date, end_date, portals)
+        with self._connect() as conn:
+            return conn.execute(
+                f"SELECT {_PERIODS[period]} AS periode, portal, SUM(n) FROM rollup_portal_daily "
+                f"WHERE {where} GROUP BY periode, portal ORDER BY periode, portal", params
+            ).fetchall()
+
+    def top_categories(self, limit=5, start_date=None, end_date=None, portals=None, include_non_pdrb=False):
+        """
+        Kategori dengan jumlah berita terbanyak. Mengembalikan list (kategori, jumlah).
+        """
+        where, params = self._rollup_filters(start_date, end_date, portals)
+        if not include_non_pdrb:
+            where += " AND category != ?"
+            params.append(NON_PDRB_LABEL)
+        with self._connect() as conn:
+            return conn.execute(
+                f"SELECT category, SUM(n) AS total FROM rollup_category_daily WHERE {where} "
+                f"GROUP BY category ORDER BY total DESC, category LIMIT ?", params + [limit]
+            ).fetchall()
+
+    def rollup_portals(self):
+        with self._connect() as conn:
+            return [portal for portal, in conn.execute("SELECT DISTINCT portal FROM rollup_portal_daily ORDER BY portal")]
+
+    def rollup_categories(self):
+        with self._connect() as conn:
+            return [category for category, in conn.execute("SELECT DISTINCT category FROM rollup_category_daily ORDER BY category")]
+
+    def rollup_date_range(self):
+        """
+        Tanggal paling awal dan paling akhir yang ada di rollup, sebagai string ISO (atau None).
+        """
+        with self._connect() as conn:
+            return conn.execute("SELECT MIN(tanggal), MAX(tanggal) FROM rollup_portal_daily WHERE tanggal != ''").fetchone()
@@ -0,0 +1,176 @@
+import os
+import random
+import sqlite3
+import threading
+from datetime import date
+from types import SimpleNamespace
+import pytest
+from classifier import (
+    CATEGORY_FILES, build_category_tree, build_keyword_index, classify_with_index,
+    load_categories, load_category_tree, read_category_rows
+)
+from store import ArticleStore
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SHIPPED_CATEGORY_FILES = [os.path.join(ROOT, file_name) for file_name in CATEGORY_FILES]
+
+# Kata pengisi teks acak; "kemasan" menguji word boundary keyword "emas"
+FILLER_WORDS = ["kota", "warga", "pemerintah", "hari", "ini", "kemasan", "rapat", "tahun", "baru", "Batam"]
+PORTALS = ["Ulasan", "Batampos", "Presmedia"]
+
+# Urutan sektor yang diharapkan dari load_category_tree() atas file kategori bawaan
+EXPECTED_SECTORS = [
+    'Pertanian, Kehutanan, dan Perikanan',
+    'Pertambangan dan Penggalian',
+    'Industri Pengolahan',
+    'Pengadaan Listrik dan Gas',
+    'Pengadaan Air, Pengelolaan Sampah, Limbah dan Daur Ulang',
+    'Konstruksi',
+    'Perdagangan Besar dan Eceran; Reparasi Mobil dan Sepeda Motor',
+    'Transportasi dan Pergudangan',
+    'Penyediaan Akomodasi dan Makan Minum',
+    'Informasi dan Komunikasi',
+    'Jasa Keuangan dan Asuransi',
+    'Real Estate',
+    'Jasa Perusahaan',
+    'Administrasi Pemerintahan, Pertahanan dan Jaminan Sosial Wajib',
+    'Jasa Pendidikan',
+    'Jasa Kesehatan dan Kegiatan Sosial',
+    'Jasa lainnya',
+    '1. Pengeluaran Konsumsi Rumah Tangga (1.a. s/d 1.l.)',
+    '2. Pengeluaran Konsumsi LNPRT',
+    '3. Pengeluaran Konsumsi Pemerintah (3.a. + 3.b.)',
+    '4. Pembentukan Modal Tetap Bruto (4.a. + 4.b.)',
+    '5. Perubahan Inventori',
+    '6. Ekspor',
+    '7. Impor',
+    '(8. Net Ekspor)',
+]
+
+def test_shipped_category_tree_sectors(capsys):
+    assert list(load_category_tree(SHIPPED_CATEGORY_FILES)) == EXPECTED_SECTORS
+    # Semua baris tanpa baris sektor di atasnya tercatat di SECTOR_STARTS
+    assert "⚠️" not in capsys.readouterr().out
+
+def test_renamed_sector_row_warns(capsys):
+    rows = [("Konstruksi Gedung" if kategori == "Konstruksi" else kategori, uraian)
+            for kategori, uraian in read_category_rows(SHIPPED_CATEGORY_FILES)]
+    tree = build_category_tree(rows)
+    assert "Konstruksi" not in tree
+    assert "'Konstruksi Gedung' tidak memiliki baris sektor" in capsys.readouterr().out
+
+# --- ArticleStore ---
+
+def make_articles(rng, links, vocab, texts):
+    """
+    Artikel palsu dengan atribut yang dibaca ArticleStore.add_batch.
+    Isi terakhir setiap link dicatat di `texts`.
+    """
+    articles = []
+    for link in links:
+        texts[link] = " ".join(rng.choice(vocab) for _ in range(rng.randint(0, 40)))
+        articles.append(SimpleNamespace(
+            judul=link, link=link, portal=rng.choice(PORTALS),
+            tanggal=date(2025, 8, rng.randint(1, 31)), isi=texts[link]
+        ))
+    return articles
+
+def read_rollups(path):
+    conn = sqlite3.connect(path)
+    try:
+        return (sorted(conn.execute("SELECT * FROM rollup_category_daily")),
+                sorted(conn.execute("SELECT * FROM rollup_portal_daily")))
+    finally:
+        conn.close()
+
+def rebuilt_rollups(store):
+    # Rollup yang dihitung ulang dari tabel artikel, tanpa mengubah basis data
+    conn = sqlite3.connect(store.path)
+    try:
+        store._rebuild_rollups(conn)
+        return (sorted(conn.execute("SELECT * FROM rollup_category_daily")),
+                sorted(conn.execute("SELECT * FROM rollup_portal_daily")))
+    finally:
+        conn.rollback()
+        conn.close()
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_incremental_sync_matches_full_classification(tmp_path, seed):
+    """
+    Setelah setiap perubahan acak pada set keyword (ditambah, dihapus, dipindah
+    antar kategori, urutan kategori diacak) atau scraping ulang sebagian link,
+    label tersimpan harus sama dengan klasifikasi ulang penuh, dan rollup
+    inkremental harus sama dengan rollup yang dihitung ulang.
+    """
+    rng = random.Random(seed)
+    all_categories = load_categories(SHIPPED_CATEGORY_FILES)
+    chosen = set(rng.sample(sorted(all_categories), 12))
+    categories = {category: list(keywords) for category, keywords in all_categories.items() if category in chosen}
+    keywords = sorted({keyword for category_keywords in categories.values() for keyword in category_keywords})
+    vocab = keywords + sorted({word for keyword in keywords for word in keyword.split()}) + FILLER_WORDS
+    texts = {}
+
+    store = ArticleStore(str(tmp_path / "berita.sqlite3"))
+    store.add_batch(make_articles(rng, [f"artikel-{i}" for i in range(150)], vocab, texts), categories)
+
+    for round_number in range(25):
+        names = list(categories)
+        action = rng.choice(["tambah", "hapus", "pindah", "urutan", "scrape ulang"])
+        if action == "tambah":
+            category = rng.choice(names)
+            categories[category].append(rng.choice([keyword for keyword in vocab if keyword not in categories[category]]))
+        elif action in ("hapus", "pindah"):
+            source = rng.choice([category for category in names if categories[category]])
+            keyword = categories[source].pop(rng.randrange(len(categories[source])))
+            target = rng.choice(names)
+            if action == "pindah" and keyword not in categories[target]:
+                categories[target].append(keyword)
+        elif action == "urutan":
+            rng.shuffle(names)
+            categories = {category: categories[category] for category in names}
+
+        if action == "scrape ulang":
+            links = rng.sample(sorted(texts), 20) + [f"baru-{round_number}-{i}" for i in range(5)]
+            store.add_batch(make_articles(rng, links, vocab, texts), categories)
+        else:
+            store.sync_categories(categories)
+
+        index = build_keyword_index(categories)
+        stored = store.labels_by_link()
+        expected = {link: classify_with_index(text, index) for link, text in texts.items()}
+        assert stored == expected, f"putaran {round_number} ({action})"
+        assert read_rollups(store.path) == rebuilt_rollups(store), f"putaran {round_number} ({action})"
+
+@pytest.mark.parametrize("shared_store", [True, False])
+def test_concurrent_add_batch_with_overlapping_links(tmp_path, shared_store):
+    """
+    Dua job yang menyimpan link yang sama secara bersamaan tidak boleh gagal
+    (UNIQUE constraint atau basis data terkunci) dan tidak boleh menggandakan
+    artikel atau rollup, baik memakai satu ArticleStore (aplikasi) maupun
+    dua instance terpisah (misalnya dua proses).
+    """
+    rng = random.Random(0)
+    # Set keyword lengkap agar kedua batch benar-benar berjalan bersamaan
+    categories = load_categories(SHIPPED_CATEGORY_FILES)
+    vocab = sorted({keyword for keywords in categories.values() for keyword in keywords}) + FILLER_WORDS
+    batches = [make_articles(rng, [f"artikel-{i}" for i in range(start, start + 60)], vocab, {}) for start in (0, 30)]
+    start_together = threading.Barrier(len(batches))
+    errors = []
+
+    def run(articles):
+        try:
+            start_together.wait()
+            (store if shared_store else ArticleStore(store.path)).add_batch(articles, categories)
+        except Exception as e:
+            errors.append(e)
+
+    store = ArticleStore(str(tmp_path / "berita.sqlite3"))
+    threads = [threading.Thread(target=run, args=(articles,)) for articles in batches]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert store.count() == 90
+    assert read_rollups(store.path) == rebuilt_rollups(store)